@@ -0,0 +1,130 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from labelcomposer.label import AtomicLabel, Label
+
+Hierarchy = Tuple[List[AtomicLabel], List[Label]]
+
+
+def synthetic(n_atoms: int, n_labels: int, density: float, seed: int = 0) -> Hierarchy:
+    # every label contains each atom with probability `density`, so the density controls how much labels overlap
+    rng = np.random.default_rng(seed)
+    atoms = [AtomicLabel(f"atom {k}", k + 1) for k in range(n_atoms)]
+    labels = []
+    for k in range(n_labels):
+        members = rng.random(n_atoms) < density
+        members[rng.integers(n_atoms)] = True
+        labels.append(Label([atom for atom, member in zip(atoms, members) if member], f"label {k}"))
+    return atoms, labels
+
+
+def nested(n_atoms: int, branching: int, seed: int = 0) -> Hierarchy:
+    # a tree of labels over the atoms, as in organelle hierarchies where e.g. membrane and lumen make up an organelle
+    rng = np.random.default_rng(seed)
+    atoms = [AtomicLabel(f"atom {k}", k + 1) for k in range(n_atoms)]
+    labels = []
+    level = [[atom] for atom in atoms]
+    while len(level) > 1:
+        order = rng.permutation(len(level))
+        merged = []
+        for start in range(0, len(level), branching):
+            group = [atom for k in order[start : start + branching] for atom in level[k]]
+            labels.append(Label(group, f"node {len(labels)}"))
+            merged.append(group)
+        level = merged
+    return atoms, labels
+
+
+def organelles() -> Hierarchy:
+    # the organelle hierarchy of `test_realistic`
+    names = [
+        "ECS",
+        "PM",
+        "Mito mem",
+        "Mito lum",
+        "Mito Ribo",
+        "Golgi mem",
+        "Golgi lum",
+        "Vesicle mem",
+        "Vesicle lum",
+        "Endo mem",
+        "Endo lum",
+        "Lyso mem",
+        "Lyso lum",
+        "LD mem",
+        "LD lum",
+        "ER mem",
+        "ER lum",
+        "ERES mem",
+        "ERES lum",
+        "NE mem",
+        "NE lum",
+        "NP out",
+        "NP in",
+        "H Chrom",
+        "N-H Chrom",
+        "E Chrom",
+        "N-E Chrom",
+        "Nucleoplasm",
+        "Nucleolus",
+        "MT out",
+        "Centrosome",
+        "Centrosome D App",
+        "Centrosome SD App",
+        "Ribo",
+        "Cytosol",
+        "MT in",
+    ]
+    atoms = {name: AtomicLabel(name, k + 1) for k, name in enumerate(names)}
+    composed = {
+        "Mito": ["Mito mem", "Mito lum", "Mito Ribo"],
+        "Golgi": ["Golgi mem", "Golgi lum"],
+        "Vesicle": ["Vesicle mem", "Vesicle lum"],
+        "Endo": ["Endo mem", "Endo lum"],
+        "Lyso": ["Lyso mem", "Lyso lum"],
+        "LD": ["LD mem", "LD lum"],
+        "ER mem": ["ER mem", "ERES mem", "NE mem"],
+        "ER": ["ER mem", "ER lum", "ERES mem", "ERES lum", "NE mem", "NE lum", "NP in", "NP out"],
+        "ERES": ["ERES mem", "ERES lum"],
+        "NE": ["NE mem", "NE lum", "NP out", "NP in"],
+        "NP": ["NP out", "NP in"],
+        "chromatin": ["H Chrom", "N-H Chrom", "E Chrom", "N-E Chrom"],
+        "Nucleus": [
+            "NE mem",
+            "NE lum",
+            "NP out",
+            "NP in",
+            "H Chrom",
+            "N-H Chrom",
+            "E Chrom",
+            "N-E Chrom",
+            "Nucleoplasm",
+            "Nucleolus",
+        ],
+        "MT": ["MT out", "MT in", "Centrosome"],
+        "Centrosome": ["Centrosome", "Centrosome D App", "Centrosome SD App"],
+    }
+    single = [
+        "ECS",
+        "PM",
+        "Mito mem",
+        "Mito Ribo",
+        "Golgi mem",
+        "Vesicle mem",
+        "Endo mem",
+        "Lyso mem",
+        "LD mem",
+        "NP out",
+        "N-H Chrom",
+        "E Chrom",
+        "N-E Chrom",
+        "Nucleolus",
+        "MT out",
+        "Centrosome D App",
+        "Centrosome SD App",
+        "Ribo",
+    ]
+    labels = [Label([atoms[name]], name) for name in single if name not in composed]
+    labels += [Label([atoms[name] for name in members], name) for name, members in composed.items()]
+    return list(atoms.values()), labels
@@ -0,0 +1,135 @@
+# Benchmarks of LabelCollection construction, queries and volume composition.
+#
+#   python benchmarks/run.py --save baseline.json      # record a baseline
+#   python benchmarks/run.py --compare baseline.json   # fail if any case got slower than the tolerance allows
+import argparse
+import json
+import platform
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from labelcomposer.__about__ import __version__
+from labelcomposer.label import AtomicLabel, LabelCollection
+from labelcomposer.lut import LabelLUT
+
+sys.path.insert(0, str(Path(__file__).parent))
+from hierarchies import Hierarchy, nested, organelles, synthetic
+
+# a case is a name and a factory returning the statement to time, the factory is called before every repeat
+Case = Tuple[str, Callable[[], Callable[[], object]]]
+
+HIERARCHIES: Dict[str, Callable[[], Hierarchy]] = {
+    "organelles": organelles,
+    "sparse-100x50": lambda: synthetic(100, 50, 0.05),
+    "dense-100x50": lambda: synthetic(100, 50, 0.5),
+    "sparse-1000x300": lambda: synthetic(1000, 300, 0.01),
+    "nested-1000": lambda: nested(1000, 4),
+}
+QUICK = ("organelles", "sparse-100x50")
+N_QUERIES = 200
+VOLUME_SHAPE = (64, 64, 64)
+
+
+def _queries(atoms: List[AtomicLabel], seed: int = 0) -> List[set]:
+    rng = np.random.default_rng(seed)
+    return [{atom for atom, pick in zip(atoms, rng.random(len(atoms)) < 0.1) if pick} for _ in range(N_QUERIES)]
+
+
+def _cases(name: str, hierarchy: Hierarchy) -> Iterator[Case]:
+    atoms, labels = hierarchy
+    queries = _queries(atoms)
+    matrix = np.random.default_rng(1).random((N_QUERIES, len(atoms))) < 0.1
+    volume = np.random.default_rng(2).integers(0, len(atoms) + 1, VOLUME_SHAPE)
+    extra = AtomicLabel("extra atom", len(atoms) + 1)
+
+    def construction():
+        return lambda: LabelCollection(atoms, labels)
+
+    def add_atom():
+        collection = LabelCollection(atoms, labels)
+        return lambda: collection.add_atom(extra)
+
+    def can_compute():
+        # a fresh collection per repeat, so the memo of earlier repeats does not hide the cost of the queries
+        collection = LabelCollection(atoms, labels)
+        return lambda: [collection.can_compute(query) for query in queries]
+
+    def can_compute_many():
+        collection = LabelCollection(atoms, labels)
+        return lambda: collection.can_compute_many(matrix)
+
+    def compose():
+        lut = LabelLUT.from_collection(LabelCollection(atoms, labels), labels)
+        return lambda: lut.apply(volume)
+
+    for case in (construction, add_atom, can_compute, can_compute_many, compose):
+        yield f"{name}/{case.__name__}", case
+
+
+def measure(factory: Callable[[], Callable[[], object]], repeat: int) -> Dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        stmt = factory()
+        times.append(timeit.timeit(stmt, number=1))
+    return {"best": min(times), "median": float(np.median(times)), "repeat": repeat}
+
+
+def run(names: List[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name in names:
+        for case, factory in _cases(name, HIERARCHIES[name]()):
+            results[case] = measure(factory, repeat)
+            print(f"{case:<40} {results[case]['best'] * 1e3:10.3f} ms")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> bool:
+    ok = True
+    for case, result in results.items():
+        if case not in baseline:
+            continue
+        ratio = result["best"] / baseline[case]["best"]
+        slower = ratio > tolerance
+        ok &= not slower
+        print(f"{case:<40} {ratio:6.2f}x {'SLOWER' if slower else ''}")
+    return ok
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks of LabelCollection construction and queries.")
+    parser.add_argument("--save", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="compare the results against this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="slowdown relative to the baseline that fails")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="only run the small hierarchies")
+    parser.add_argument("hierarchies", nargs="*", help=f"hierarchies to benchmark, out of {', '.join(HIERARCHIES)}")
+    args = parser.parse_args(argv)
+    unknown = set(args.hierarchies) - set(HIERARCHIES)
+    if unknown:
+        parser.error(f"unknown hierarchies {', '.join(sorted(unknown))}")
+
+    names = args.hierarchies or (list(QUICK) if args.quick else list(HIERARCHIES))
+    results = run(names, args.repeat)
+    if args.save is not None:
+        record = {
+            "meta": {
+                "labelcomposer": __version__,
+                "numpy": np.__version__,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+            },
+            "results": results,
+        }
+        args.save.write_text(json.dumps(record, indent=2))
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())["results"]
+        return 0 if compare(results, baseline, args.tolerance) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,5 +2,6 @@
 #
 # SPDX-License-Identifier: MIT
 from labelcomposer.label import AtomicLabel, Label, LabelCollection
+from labelcomposer.lut import LabelLUT
 
-__all__ = ["AtomicLabel", "Label", "LabelCollection"]
+__all__ = ["AtomicLabel", "Label", "LabelCollection", "LabelLUT"]
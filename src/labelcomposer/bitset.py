@@ -0,0 +1,72 @@
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from labelcomposer.label import AtomicLabel
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class AtomBits:
+    # Interns the atoms of a collection to bit positions so that sets of atoms can be handled as integer bitmasks.
+    def __init__(self, atoms: Iterable["AtomicLabel"] = ()):
+        self._position: Dict["AtomicLabel", int] = {}
+        self._atoms: List["AtomicLabel"] = []
+        self.universe = 0
+        for atom in atoms:
+            self.add(atom)
+
+    def __len__(self) -> int:
+        return len(self._position)
+
+    def __contains__(self, atom: object) -> bool:
+        return atom in self._position
+
+    def add(self, atom: "AtomicLabel") -> int:
+        position = self._position.get(atom)
+        if position is None:
+            position = len(self._atoms)
+            self._position[atom] = position
+            self._atoms.append(atom)
+            self.universe |= 1 << position
+        return 1 << position
+
+    def remove(self, atom: "AtomicLabel") -> int:
+        # the position of a removed atom is not reused
+        position = self._position.pop(atom)
+        bit = 1 << position
+        self.universe &= ~bit
+        return bit
+
+    def bit(self, atom: "AtomicLabel") -> int:
+        return 1 << self._position[atom]
+
+    def to_mask(self, atoms: Iterable["AtomicLabel"]) -> Optional[int]:
+        # returns None if any of the atoms is not interned
+        mask = 0
+        position = self._position
+        for atom in atoms:
+            pos = position.get(atom)
+            if pos is None:
+                return None
+            mask |= 1 << pos
+        return mask
+
+    def to_atoms(self, mask: int) -> FrozenSet["AtomicLabel"]:
+        atoms = self._atoms
+        return frozenset(atoms[pos] for pos in iter_bits(mask))
+
+    def get_atom(self, position: int) -> "AtomicLabel":
+        return self._atoms[position]
+
+    def get_atoms(self) -> List["AtomicLabel"]:
+        # all interned atoms, ordered by bit position
+        return [self._atoms[pos] for pos in iter_bits(self.universe)]
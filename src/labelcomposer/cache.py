@@ -0,0 +1,59 @@
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Mapping, Tuple, TypeVar
+
+from labelcomposer.frozen import FrozenLabelCollection
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+
+K = TypeVar("K", bound=Hashable)
+CollectionKey = Tuple[FrozenSet[AtomicLabel], FrozenSet[Label]]
+Computable = FrozenSet[FrozenSet[AtomicLabel]]
+
+
+class CollectionCache:
+    # Factory for immutable collections keyed on their atoms and labels. Crops that annotate the same subset of labels
+    # over the same atoms share a single FrozenLabelCollection instead of each computing their own.
+    def __init__(self):
+        self._collections: Dict[CollectionKey, FrozenLabelCollection] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, atoms: Iterable[AtomicLabel], labels: Iterable[Label] = ()) -> FrozenLabelCollection:
+        key = (frozenset(atoms), frozenset(labels))
+        collection = self._collections.get(key)
+        if collection is None:
+            self.misses += 1
+            collection = self._collections.setdefault(key, FrozenLabelCollection(key[0], key[1]))
+        else:
+            self.hits += 1
+        return collection
+
+    def get_like(self, prototype: LabelCollection, labels: Iterable[Label] = ()) -> FrozenLabelCollection:
+        return self.get(prototype.get_atoms(), labels)
+
+    def __len__(self) -> int:
+        return len(self._collections)
+
+    def clear(self):
+        self._collections.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def computable_signature(collection: LabelCollection) -> Computable:
+    # two collections over the same atoms can compute exactly the same sets iff their partitions agree
+    if len(collection.get_derived_labels()) == 0:
+        return frozenset()
+    bits = collection._bits
+    return frozenset(bits.to_atoms(cls) for cls in collection._partition.get_classes())
+
+
+def group_by_computable(collections: Mapping[K, LabelCollection]) -> Dict[Computable, List[K]]:
+    # groups e.g. crops by what they can compute, keyed on the partition of their atoms
+    groups: Dict[Computable, List[K]] = {}
+    shared: Dict[int, Computable] = {}
+    for key, collection in collections.items():
+        # collections from a CollectionCache are shared, so their signature only needs to be computed once
+        signature = shared.get(id(collection))
+        if signature is None:
+            signature = shared[id(collection)] = computable_signature(collection)
+        groups.setdefault(signature, []).append(key)
+    return groups
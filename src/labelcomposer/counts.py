@@ -0,0 +1,72 @@
+from typing import Any, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from labelcomposer.label import AnyLabelType, AtomicLabel, Label, LabelCollection, as_atom_set
+from labelcomposer.lut import as_index_array, clip_indices, table_size
+from labelcomposer.stream import iter_chunks
+
+
+def atom_histogram(
+    source: Any, chunk_shape: Optional[Sequence[int]] = None, minlength: int = 0, size: Optional[int] = None
+) -> np.ndarray:
+    # Number of voxels per atom index in `source`, read chunk by chunk if `chunk_shape` is given. Histograms of several
+    # volumes can simply be added up. Given the `size` of a table, negative and out-of-range indices are no atoms and
+    # are all counted in one trailing bin at `size`.
+    histogram = np.zeros(minlength if size is None else max(minlength, size + 1), dtype=np.int64)
+    chunks = [()] if chunk_shape is None else iter_chunks(source.shape, chunk_shape)
+    for chunk in chunks:
+        if size is None:
+            volume = as_index_array(source[chunk]).astype(np.intp, copy=False)
+        else:
+            volume = clip_indices(source[chunk], size) % (size + 1)
+        counts = np.bincount(volume.ravel(), minlength=len(histogram))
+        counts[: len(histogram)] += histogram
+        histogram = counts
+    return histogram
+
+
+class LabelCounts:
+    # Voxel counts of every derived label and every computable set of atoms, aggregated from a single histogram of
+    # atom indices. Derived labels are counted with one product of their membership matrix and the histogram, any
+    # computable set by adding up the counts of the classes of the partition it is made of.
+    def __init__(self, collection: LabelCollection, histogram: np.ndarray):
+        self.collection = collection
+        self.histogram = np.asarray(histogram, dtype=np.int64)
+        lut = collection.compile_lut(list(collection.get_derived_labels()))
+        size = lut.table.shape[1]
+        # atoms beyond the histogram do not occur in the volume, indices beyond the table are no atoms of the collection
+        padded = np.zeros(size, dtype=np.int64)
+        padded[: min(size, len(self.histogram))] = self.histogram[:size]
+        self.atoms: Dict[AtomicLabel, int] = {atom: int(padded[atom.index]) for atom in collection.get_atoms()}
+        self.labels: Dict[Label, int] = dict(zip(lut.labels, (lut.table.astype(np.int64) @ padded).tolist()))
+        bits = collection._bits
+        self._classes: Dict[int, int] = {
+            cls: sum(self.atoms[atom] for atom in bits.to_atoms(cls)) for cls in collection._partition.get_classes()
+        }
+
+    @classmethod
+    def from_volume(
+        cls, collection: LabelCollection, source: Any, chunk_shape: Optional[Sequence[int]] = None
+    ) -> "LabelCounts":
+        return cls(collection, atom_histogram(source, chunk_shape, size=table_size(collection.get_atoms())))
+
+    @property
+    def total(self) -> int:
+        # all voxels, including those with indices that are no atoms of the collection
+        return int(self.histogram.sum())
+
+    def count(self, target: Union[str, "AnyLabelType"]) -> int:
+        if isinstance(target, str):
+            return self.labels[self.collection.get_label_by_name(target)]
+        if isinstance(target, Label) and target in self.labels:
+            return self.labels[target]
+        atoms = as_atom_set(target)
+        if atoms is None:
+            msg = f"Unknown type of `target`: {type(target)}"
+            raise TypeError(msg)
+        if not self.collection.can_compute(set(atoms)):
+            msg = f"{target} cannot be computed from this LabelCollection."
+            raise ValueError(msg)
+        mask = self.collection._bits.to_mask(atoms)
+        return sum(count for cls, count in self._classes.items() if cls & mask)
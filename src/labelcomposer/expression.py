@@ -0,0 +1,248 @@
+from collections import Counter
+from dataclasses import dataclass, fields
+from typing import AbstractSet, Dict, FrozenSet, Iterator, Mapping, Optional, Set, Union
+
+import numpy as np
+
+from labelcomposer.label import AtomicLabel, Label, as_atom_set
+from labelcomposer.lut import lookup, membership_table, table_size
+
+MaskMapping = Mapping[Union[str, Label], np.ndarray]
+Universe = Optional[AbstractSet[AtomicLabel]]
+
+
+class Expr:
+    # Expression over the masks of labels. Equal subexpressions compare equal, so a plan is a DAG and shared
+    # intermediates are only evaluated once. Combining expressions with |, +, -, & and ~ builds a lazy graph; labels,
+    # atoms and sets of atoms are wrapped automatically.
+    def __post_init__(self):
+        # nodes are keyed by value all over, so the hash is computed once from the cached hashes of the children
+        object.__setattr__(self, "_hash", hash((type(self), *self._values())))
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, f.name) for f in fields(self))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        # shared subexpressions compare by identity, so comparing two DAGs does not walk every path
+        if self is other:
+            return True
+        if type(self) is not type(other) or hash(self) != hash(other):
+            return False
+        return self._values() == other._values()
+
+    def children(self) -> Iterator["Expr"]:
+        yield from ()
+
+    def __or__(self, other: object) -> "Expr":
+        other_expr = _as_expr(other)
+        return NotImplemented if other_expr is None else Or(self, other_expr)
+
+    def __ror__(self, other: object) -> "Expr":
+        other_expr = _as_expr(other)
+        return NotImplemented if other_expr is None else Or(other_expr, self)
+
+    __add__ = __or__
+    __radd__ = __ror__
+
+    def __sub__(self, other: object) -> "Expr":
+        other_expr = _as_expr(other)
+        return NotImplemented if other_expr is None else Sub(self, other_expr)
+
+    def __rsub__(self, other: object) -> "Expr":
+        other_expr = _as_expr(other)
+        return NotImplemented if other_expr is None else Sub(other_expr, self)
+
+    def __and__(self, other: object) -> "Expr":
+        other_expr = _as_expr(other)
+        return NotImplemented if other_expr is None else And(self, other_expr)
+
+    def __rand__(self, other: object) -> "Expr":
+        other_expr = _as_expr(other)
+        return NotImplemented if other_expr is None else And(other_expr, self)
+
+    def __invert__(self) -> "Expr":
+        return Not(self)
+
+    def resolve(self, universe: Universe = None) -> FrozenSet[AtomicLabel]:
+        # the set of atoms the expression stands for, complements are taken within `universe`
+        return resolve(self, universe)
+
+    def compile(self, universe: Universe = None) -> np.ndarray:
+        # lookup table from atom index to membership in the resolved set of atoms
+        atoms = self.resolve(universe)
+        size = table_size(atoms if universe is None else universe)
+        return membership_table([atoms], size)[0]
+
+    def apply(self, volume: np.ndarray, universe: Universe = None) -> np.ndarray:
+        # mask of the expression on a volume of atom indices, computed in a single lookup pass however deeply the
+        # expression is nested
+        return lookup(self.compile(universe), volume)
+
+    def nodes(self) -> Set["Expr"]:
+        seen: Set[Expr] = set()
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(node.children())
+        return seen
+
+    @property
+    def n_ops(self) -> int:
+        # number of distinct mask operations needed to evaluate the expression
+        return sum(1 for node in self.nodes() if not isinstance(node, LabelRef))
+
+
+@dataclass(frozen=True, eq=False)
+class LabelRef(Expr):
+    label: Label
+
+    def __str__(self) -> str:
+        return str(self.label.name)
+
+
+@dataclass(frozen=True, eq=False)
+class Not(Expr):
+    child: Expr
+
+    def children(self) -> Iterator[Expr]:
+        yield self.child
+
+    def __str__(self) -> str:
+        return f"~{self.child}"
+
+
+@dataclass(frozen=True, eq=False)
+class BinaryExpr(Expr):
+    left: Expr
+    right: Expr
+    symbol = "?"
+
+    def children(self) -> Iterator[Expr]:
+        yield self.left
+        yield self.right
+
+    def __str__(self) -> str:
+        return f"({self.left} {self.symbol} {self.right})"
+
+
+@dataclass(frozen=True, eq=False)
+class Or(BinaryExpr):
+    symbol = "|"
+
+
+@dataclass(frozen=True, eq=False)
+class And(BinaryExpr):
+    symbol = "&"
+
+
+@dataclass(frozen=True, eq=False)
+class Sub(BinaryExpr):
+    symbol = "-"
+
+
+def lazy(obj: Union[Expr, Label, AtomicLabel, AbstractSet[AtomicLabel]]) -> Expr:
+    expr = _as_expr(obj)
+    if expr is None:
+        msg = f"Cannot build an expression from {type(obj).__name__}"
+        raise TypeError(msg)
+    return expr
+
+
+def _as_expr(obj: object) -> Optional[Expr]:
+    if isinstance(obj, Expr):
+        return obj
+    if isinstance(obj, Label):
+        return LabelRef(obj)
+    if isinstance(obj, AtomicLabel):
+        return LabelRef(Label([obj], obj.name))
+    atoms = as_atom_set(obj)
+    if atoms is None:
+        return None
+    return LabelRef(Label(frozenset(atoms)))
+
+
+def resolve(expr: Expr, universe: Universe = None) -> FrozenSet[AtomicLabel]:
+    results: Dict[Expr, FrozenSet[AtomicLabel]] = {}
+
+    def visit(node: Expr) -> FrozenSet[AtomicLabel]:
+        if node in results:
+            return results[node]
+        if isinstance(node, LabelRef):
+            result = node.label.included
+        elif isinstance(node, Not):
+            if universe is None:
+                msg = "Resolving a complement requires a universe of atoms."
+                raise ValueError(msg)
+            result = frozenset(universe) - visit(node.child)
+        elif isinstance(node, Or):
+            result = visit(node.left) | visit(node.right)
+        elif isinstance(node, And):
+            result = visit(node.left) & visit(node.right)
+        elif isinstance(node, Sub):
+            result = visit(node.left) - visit(node.right)
+        else:
+            msg = f"Unknown expression type {type(node).__name__}"
+            raise TypeError(msg)
+        results[node] = result
+        return result
+
+    return visit(expr)
+
+
+def _lookup(masks: MaskMapping, label: Label) -> np.ndarray:
+    if label in masks:
+        return np.asarray(masks[label], dtype=bool)
+    if label.name in masks:
+        return np.asarray(masks[label.name], dtype=bool)
+    msg = f"No mask provided for {label}."
+    raise KeyError(msg)
+
+
+def evaluate(expr: Expr, masks: MaskMapping) -> np.ndarray:
+    # Evaluates `expr` on boolean masks given per label (keyed by Label or by name). Shared subexpressions are computed
+    # once, and intermediates with a single consumer are overwritten in place instead of allocating new arrays.
+    uses: Counter = Counter()
+    for node in expr.nodes():
+        uses.update(node.children())
+    results: Dict[Expr, np.ndarray] = {}
+    owned: Set[Expr] = set()
+
+    def reusable(node: Expr) -> bool:
+        return node in owned and uses[node] == 1
+
+    def visit(node: Expr) -> np.ndarray:
+        if node in results:
+            return results[node]
+        if isinstance(node, LabelRef):
+            result = _lookup(masks, node.label)
+        elif isinstance(node, Not):
+            child = visit(node.child)
+            result = np.logical_not(child, out=child if reusable(node.child) else None)
+            owned.add(node)
+        elif isinstance(node, BinaryExpr):
+            left = visit(node.left)
+            right = visit(node.right)
+            out = left if reusable(node.left) else right if reusable(node.right) else None
+            if isinstance(node, Or):
+                result = np.logical_or(left, right, out=out)
+            elif isinstance(node, And):
+                result = np.logical_and(left, right, out=out)
+            elif isinstance(node, Sub):
+                # for booleans, left > right is left & ~right
+                result = np.greater(left, right, out=out)
+            else:
+                msg = f"Unknown expression type {type(node).__name__}"
+                raise TypeError(msg)
+            owned.add(node)
+        else:
+            msg = f"Unknown expression type {type(node).__name__}"
+            raise TypeError(msg)
+        results[node] = result
+        return result
+
+    return visit(expr)
@@ -0,0 +1,75 @@
+from typing import Dict, FrozenSet, Optional, Tuple, Union
+
+from labelcomposer.label import AnyLabelType, AtomicLabel, Label, LabelCollection
+from labelcomposer.lut import LabelLUT, LabelSelection
+from labelcomposer.serialization import from_bytes, to_bytes
+
+
+class FrozenLabelCollection(LabelCollection):
+    # Immutable LabelCollection. All queries only read shared state or fill caches with idempotent results, so they
+    # are safe to call from several threads without locks. Pickling sends the compact serialized form.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._frozen_memo: Dict[object, bool] = {}
+        self._luts: Dict[Optional[Tuple[Union[str, Label], ...]], LabelLUT] = {}
+        # immutable views of the internal sets, which instances shared e.g. by a CollectionCache must not hand out
+        self._views: Dict[str, FrozenSet] = {}
+
+    @classmethod
+    def from_collection(cls, collection: LabelCollection) -> "FrozenLabelCollection":
+        if isinstance(collection, FrozenLabelCollection):
+            return collection
+        return from_bytes(to_bytes(collection), cls=cls)
+
+    def __reduce__(self):
+        return (from_bytes, (to_bytes(self), type(self)))
+
+    def _immutable(self, *_args, **_kwargs):
+        msg = f"{type(self).__name__} is immutable"
+        raise TypeError(msg)
+
+    add_atom = add_atoms = add_label = add_labels = _immutable
+    remove_atom = remove_label = replace_label = _immutable
+
+    def _view(self, name: str, items) -> FrozenSet:
+        view = self._views.get(name)
+        if view is None:
+            view = self._views.setdefault(name, frozenset(items))
+        return view
+
+    def get_atoms(self) -> FrozenSet[AtomicLabel]:
+        return self._view("atoms", self._atoms)
+
+    def get_derived_labels(self) -> FrozenSet[Label]:
+        return self._view("derived_labels", self._derived_labels)
+
+    def get_computable_sets(self) -> FrozenSet[FrozenSet[AtomicLabel]]:
+        return self._view("computable_sets", super().get_computable_sets())
+
+    def _can_compute(self, test_label: AnyLabelType) -> bool:
+        # a plain dict that is never evicted from, reads and writes of single keys need no lock
+        included_set = self._query_atoms(test_label)
+        result = self._frozen_memo.get(included_set)
+        if result is None:
+            result = self._is_computable(included_set)
+            if len(self._frozen_memo) < self.memo_size:
+                self._frozen_memo[included_set] = result
+        return result
+
+    def compile_lut(self, labels: LabelSelection = None, *, shared: bool = False) -> LabelLUT:
+        # lookup tables of an immutable collection never go stale, so they are compiled once per selection. With
+        # `shared=True` a new shared memory copy is returned, which the caller has to `unlink` when done.
+        key = None if labels is None else tuple(labels)
+        lut = self._luts.get(key)
+        if lut is None:
+            lut = self._luts.setdefault(key, super().compile_lut(labels))
+        if shared:
+            return lut.share()
+        return lut
+
+    def thaw(self) -> LabelCollection:
+        return from_bytes(to_bytes(self))
+
+
+def freeze(collection: LabelCollection) -> FrozenLabelCollection:
+    return FrozenLabelCollection.from_collection(collection)
@@ -1,8 +1,14 @@
-from typing import Any, Union
+import os
+from typing import Any, Callable, TypeVar, Union
 
 from typeguard import TypeCheckError, check_type, typechecked
 
 StringLike = Union[str, bytes, bytearray]
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Arguments of the public API are always checked at runtime. Setting the environment variable
+# LABELCOMPOSER_TYPECHECK=public before importing labelcomposer skips the checks on internal methods.
+TYPECHECK_INTERNALS = os.environ.get("LABELCOMPOSER_TYPECHECK", "all") != "public"
 
 
 def check_type_bool(obj: Any, my_type, **kwargs) -> bool:
@@ -19,3 +25,9 @@ def convert_to_str(value: StringLike) -> str:
         return value.decode()
     else:
         return value
+
+
+def internal_typechecked(func: F) -> F:
+    if TYPECHECK_INTERNALS:
+        return typechecked(func)
+    return func
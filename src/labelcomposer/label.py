@@ -1,10 +1,30 @@
-import itertools
+import time
 import warnings
-from typing import FrozenSet, Iterator, Optional, Sequence, Set, TypeVar, Union
-
+import weakref
+from collections import OrderedDict
+from typing import (
+    AbstractSet,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import numpy as np
 from typeguard import CollectionCheckStrategy, check_type, typechecked
 
-from labelcomposer.helpers import StringLike, check_type_bool, convert_to_str
+from labelcomposer.bitset import AtomBits, iter_bits
+from labelcomposer.helpers import StringLike, convert_to_str, internal_typechecked
+from labelcomposer.lut import LabelLUT, LabelSelection
+from labelcomposer.partition import AtomPartition
+from labelcomposer.stats import Budget, CollectionStats
 
 T = TypeVar("T")
 AnySet = Union[FrozenSet[T], Set[T]]
@@ -13,18 +33,54 @@ check_all = CollectionCheckStrategy.ALL_ITEMS
 
 
 class AtomicLabel:
+    # Atoms are immutable and interned: creating an atom with the same name and index as a living atom returns that
+    # same instance, so comparisons usually resolve by identity.
+    __slots__ = ("_name", "_index", "_hash", "__weakref__")
+    _registry: "weakref.WeakValueDictionary[Tuple[type, str, Optional[int]], AtomicLabel]" = (
+        weakref.WeakValueDictionary()
+    )
+
     @typechecked
-    def __init__(self, name: StringLike, index: Union[None, int] = None):
-        self.name: str = convert_to_str(name)
-        self.index = index
+    def __new__(cls, name: StringLike, index: Union[None, int] = None) -> "AtomicLabel":
+        name = convert_to_str(name)
+        key = (cls, name, index)
+        atom = cls._registry.get(key)
+        if atom is None:
+            atom = super().__new__(cls)
+            object.__setattr__(atom, "_name", name)
+            object.__setattr__(atom, "_index", index)
+            object.__setattr__(atom, "_hash", hash((name, index)))
+            atom = cls._registry.setdefault(key, atom)
+        return atom
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def index(self) -> Optional[int]:
+        return self._index
+
+    def __setattr__(self, name: str, value: object):
+        msg = f"{type(self).__name__} is immutable"
+        raise AttributeError(msg)
+
+    def __delattr__(self, name: str):
+        msg = f"{type(self).__name__} is immutable"
+        raise AttributeError(msg)
+
+    def __reduce__(self):
+        return (type(self), (self._name, self._index))
 
     def __hash__(self) -> int:
-        return hash((self.name, self.index))
+        return self._hash
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, AtomicLabel):
             return False
-        return self.name == other.name and self.index == other.index
+        return self._name == other._name and self._index == other._index
 
     def __str__(self) -> str:
         if self.index is None:
@@ -80,135 +136,327 @@ class Label:
             name = convert_to_str(name)
         self._name = name
 
+    # Unsupported operands return NotImplemented, so that Python raises the TypeError unless the other operand (e.g. a
+    # lazy expression) implements the reflected operation.
     def __or__(self, other: "AnyLabelType") -> FrozenSet[AtomicLabel]:
-        if isinstance(other, (AtomicLabel)):
-            return self.included | {other}
-        elif check_type_bool(other, CollectionLike[AtomicLabel]):
-            return self.included | set(other)
-        elif isinstance(other, Label):
-            return self.included | other.included
-        else:
-            msg = f"unsupported operand type(s) for |: 'Label' and '{type(other).__name__}'"
-            raise TypeError(msg)
+        atoms = as_atom_set(other)
+        if atoms is None:
+            return NotImplemented
+        return self.included | atoms
 
     def __add__(self, other: "AnyLabelType") -> FrozenSet[AtomicLabel]:
-        if not check_type_bool(other, AnyLabelType):
-            msg = f"unsupported operand type(s) for +: 'Label' and '{type(other).__name__}'"
-            raise TypeError(msg)
+        if not isinstance(other, (AtomicLabel, Label, set, frozenset)):
+            return NotImplemented
         return self | other
 
     def __sub__(self, other: "AnyLabelType") -> FrozenSet[AtomicLabel]:
-        if isinstance(other, AtomicLabel):
-            return self.included - {other}
-        elif check_type_bool(other, CollectionLike[AtomicLabel]):
-            return self.included - set(other)
-        elif isinstance(other, Label):
-            return self.included - other.included
-        else:
-            msg = f"unsupported operand type(s) for -: 'Label' and '{type(other).__name__}'"
-            raise TypeError(msg)
+        atoms = as_atom_set(other)
+        if atoms is None:
+            return NotImplemented
+        return self.included - atoms
 
     def __and__(self, other: "AnyLabelType") -> FrozenSet[AtomicLabel]:
-        if isinstance(other, AtomicLabel):
-            return self.included - {other}
-        elif check_type_bool(other, CollectionLike[AtomicLabel]):
-            return self.included & set(other)
-        elif isinstance(other, Label):
-            return self.included & other.included
-        else:
-            msg = f"unsupported operand type(s) for &: 'Label' and '{type(other).__name__}"
-            raise TypeError(msg)
+        atoms = as_atom_set(other)
+        if atoms is None:
+            return NotImplemented
+        return self.included & atoms
 
     def __len__(self) -> int:
         return len(self.included)
 
 
-def computable(set1: AnySet, set2: AnySet) -> Set[FrozenSet]:
-    add = frozenset(set1 | set2)
-    sub1 = frozenset(set1 - set2)
-    sub2 = frozenset(set2 - set1)
-    inters = frozenset(set1 & set2)
-    disjoint = frozenset(add - inters)
-    return {frozenset(set1), frozenset(set2), add, sub1, sub2, inters, disjoint}
+def as_atom_set(other: object) -> Optional[AbstractSet[AtomicLabel]]:
+    # cheap isinstance based dispatch for the label operators, returns None for unsupported types
+    if isinstance(other, AtomicLabel):
+        return {other}
+    elif isinstance(other, Label):
+        return other.included
+    elif isinstance(other, (set, frozenset, list, tuple)) and all(isinstance(atom, AtomicLabel) for atom in other):
+        return other if isinstance(other, (set, frozenset)) else set(other)
+    return None
 
 
 class LabelCollection:
-    @typechecked
-    def __init__(self, atoms: CollectionLike[AtomicLabel], labels: Optional[CollectionLike[Label]] = None):
+    memo_size = 4096
+
+    @typechecked(collection_check_strategy=check_all)
+    def __init__(
+        self,
+        atoms: CollectionLike[AtomicLabel],
+        labels: Optional[CollectionLike[Label]] = None,
+        *,
+        stats: Optional[CollectionStats] = None,
+        budget: Optional[Budget] = None,
+    ):
+        self.stats = CollectionStats() if stats is None else stats
+        self.budget = Budget() if budget is None else budget
         self._atoms: Set[AtomicLabel] = set()
         self._derived_labels: Set[Label] = set()
-        self._computable_atoms: Set[AtomicLabel] = set()
-        self._computable_sets: Set[FrozenSet[AtomicLabel]] = set()
+        self._labels_by_name: Dict[str, Label] = {}
+        self._labels_by_content: Dict[FrozenSet[AtomicLabel], Set[Label]] = {}
+        self._bits = AtomBits()
+        self._label_masks: Dict[Label, int] = {}
+        self._partition = AtomPartition()
+        self._computable_atoms: Optional[FrozenSet[AtomicLabel]] = None
+        self._computable_sets: Optional[Set[FrozenSet[AtomicLabel]]] = None
         self._warn_size = 100
-        for atom in atoms:
-            self.add_atom(atom)
+        # bumped by every change of the computable structure, invalidates the memo of `can_compute`
+        self._generation = 0
+        self._memo_generation = 0
+        self._can_compute_memo: "OrderedDict[FrozenSet[AtomicLabel], bool]" = OrderedDict()
+        self._class_membership_cache: Optional[Tuple[int, List[AtomicLabel], np.ndarray, np.ndarray]] = None
+        self._add_atoms(atoms)
         if labels is not None:
-            for lbl in labels:
-                self.add_label(lbl)
+            self._add_labels(labels)
 
     @classmethod
     def empty_like(cls, prototype):
         return cls(prototype.get_atoms())
 
     def get_computable_atoms(self):
+        if self._computable_atoms is None:
+            if len(self._derived_labels) > 0:
+                self._computable_atoms = self._bits.to_atoms(self._partition.get_singletons())
+            else:
+                self._computable_atoms = frozenset()
         return self._computable_atoms
 
     def get_computable_sets(self):
+        # all computable sets of atoms that are not individually computable, i.e. all unions of the non-singleton
+        # classes of the partition. This grows exponentially, so it is only materialized on request.
+        if self._computable_sets is None:
+            computable_sets = set()
+            if len(self._derived_labels) > 0:
+                computable_sets = {self._bits.to_atoms(mask) for mask in self._materialize_computable_masks()}
+            self._computable_sets = computable_sets
         return self._computable_sets
 
+    def _materialize_computable_masks(self) -> Set[int]:
+        start = time.perf_counter()
+        check = self.budget.start()
+        masks: Set[int] = set()
+        for cls in self._partition.get_classes():
+            if cls & (cls - 1):
+                check(2 * len(masks) + 1)
+                masks.update([cls | other for other in masks])
+                masks.add(cls)
+                self._check_size(len(masks))
+        self.stats.sets_materialized += len(masks)
+        self.stats.materialize_seconds += time.perf_counter() - start
+        self.stats.record("materialize", len(self._partition))
+        return masks
+
+    def count_computable(self) -> int:
+        # number of non-empty computable sets of atoms, without enumerating them
+        if len(self._derived_labels) == 0:
+            return 0
+        return 2 ** len(self._partition) - 1
+
+    def iter_computable(self) -> Iterator[FrozenSet[AtomicLabel]]:
+        # lazily yields every non-empty computable set of atoms, i.e. every union of classes of the partition
+        if len(self._derived_labels) == 0:
+            return
+        classes = list(self._partition.get_classes())
+        for selection in range(1, 2 ** len(classes)):
+            mask = 0
+            for k in iter_bits(selection):
+                mask |= classes[k]
+            yield self._bits.to_atoms(mask)
+
+    def sample_computable(self, rng: Union[None, int, np.random.Generator] = None) -> FrozenSet[AtomicLabel]:
+        # draws a non-empty computable set of atoms uniformly at random
+        if self.count_computable() == 0:
+            msg = "This LabelCollection cannot compute any non-empty set of atoms."
+            raise ValueError(msg)
+        rng = np.random.default_rng(rng)
+        classes = self._partition.get_classes()
+        mask = 0
+        while mask == 0:
+            for cls, selected in zip(classes, rng.integers(0, 2, size=len(classes))):
+                if selected:
+                    mask |= cls
+        return self._bits.to_atoms(mask)
+
     def get_derived_labels(self):
         return self._derived_labels
 
     @typechecked
     def get_label_by_name(self, name: str):
-        for lbl in self.get_derived_labels():
-            if lbl.name == name:
-                return lbl
-        msg = f"No Label with name {name} in this LabelCollection."
-        raise ValueError(msg)
+        try:
+            return self._labels_by_name[name]
+        except KeyError:
+            msg = f"No Label with name {name} in this LabelCollection."
+            raise ValueError(msg) from None
 
     def __iter__(self) -> Iterator[Label]:
-        names = self.get_names()
-        for name in names:
-            yield self.get_label_by_name(name)
+        # named labels sorted by name, followed by the unnamed ones sorted by their atoms
+        for name in sorted(self._labels_by_name):
+            yield self._labels_by_name[name]
+        unnamed = [lbl for lbl in self._derived_labels if lbl.name is None]
+        yield from sorted(unnamed, key=lambda lbl: sorted(str(atom) for atom in lbl.included))
 
     def get_names(self):
-        return sorted([lbl.name for lbl in self._derived_labels])
+        return sorted(self._labels_by_name)
 
     def get_atoms(self):
         return self._atoms
 
     @typechecked
     def add_atom(self, atom: AtomicLabel):
-        self._atoms.add(atom)
-        if len(self._derived_labels) > 0:
-            self._reinit()
+        self._add_atoms([atom])
+
+    @typechecked(collection_check_strategy=check_all)
+    def add_atoms(self, atoms: CollectionLike[AtomicLabel]):
+        self._add_atoms(atoms)
+
+    @internal_typechecked
+    def _add_atoms(self, atoms: CollectionLike[AtomicLabel]):
+        # new atoms are not part of any derived label, i.e. they only extend the class of atoms outside all labels
+        # every item is checked, also when the type checks of internal methods are off
+        for atom in atoms:
+            if not isinstance(atom, AtomicLabel):
+                msg = f"Expected AtomicLabel, got {type(atom).__name__}."
+                raise TypeError(msg)
+        new_atoms = 0
+        for atom in atoms:
+            self._atoms.add(atom)
+            new_atoms |= self._bits.add(atom)
+        covered = 0
+        for mask in self._label_masks.values():
+            covered |= mask
+        n_classes = len(self._partition)
+        self._partition.extend(new_atoms, covered)
+        self.stats.classes_created += len(self._partition) - n_classes
+        self.stats.record("extend", len(self._partition))
+        self._invalidate_computable()
 
     @typechecked
     def add_label(self, label: Label):
-        self._add_to_derived_labels(label)
-
-    def _reinit(self):
-        previous_derived_labels = self._derived_labels
-        self._derived_labels = set()
-        self._computable_atoms = set()
-        self._computable_sets = set()
-        self._warn_size = 10
-        for label in previous_derived_labels:
-            self.add_label(label)
-
-    @typechecked()
-    def _add_to_derived_labels(self, label: Label):
-        if any(inc not in self._atoms for inc in label.included):
+        self._add_labels([label])
+
+    @typechecked(collection_check_strategy=check_all)
+    def add_labels(self, labels: CollectionLike[Label]):
+        self._add_labels(labels)
+
+    @internal_typechecked
+    def _add_labels(self, labels: CollectionLike[Label]):
+        # the whole batch is validated before anything is added, then the partition is refined in a single pass
+        for label in labels:
+            if not isinstance(label, Label):
+                msg = f"Expected Label, got {type(label).__name__}."
+                raise TypeError(msg)
+        masks: Dict[Label, int] = {}
+        names: Dict[str, Label] = {}
+        for label in labels:
+            masks[label] = self._check_label(label)
+            if label.name is not None and names.setdefault(label.name, label) != label:
+                msg = f"Different Labels with name {label.name} cannot be added to the same LabelCollection."
+                raise ValueError(msg)
+        # refining by the labels also covers their complements. The partition is refined first, so that a refinement
+        # aborted by the budget leaves the collection unchanged.
+        self._refine(masks.values())
+        for label, mask in masks.items():
+            self._add_to_derived_labels(label, mask)
+        self._invalidate_computable()
+
+    def _refine(self, splits: Iterable[int]):
+        start = time.perf_counter()
+        n_classes = len(self._partition)
+        self._partition.refine(splits, check=self.budget.start())
+        self.stats.refinements += 1
+        self.stats.classes_created += len(self._partition) - n_classes
+        self.stats.refine_seconds += time.perf_counter() - start
+        self.stats.record("refine", len(self._partition))
+
+    def _merge(self):
+        # merges the classes that are no longer separated by any derived label
+        start = time.perf_counter()
+        n_classes = len(self._partition)
+        self._partition.merge(self._label_masks.values())
+        self.stats.classes_merged += n_classes - len(self._partition)
+        self.stats.refine_seconds += time.perf_counter() - start
+        self.stats.record("merge", len(self._partition))
+
+    def _invalidate_computable(self):
+        self._generation += 1
+        self._computable_atoms = None
+        self._computable_sets = None
+
+    @typechecked
+    def remove_atom(self, atom: AtomicLabel):
+        if atom not in self._atoms:
+            msg = f"{atom} not part of collection"
+            raise ValueError(msg)
+        for lbl in self._derived_labels:
+            if atom in lbl.included:
+                msg = f"{atom} cannot be removed, it is part of {lbl}"
+                raise ValueError(msg)
+        self._atoms.remove(atom)
+        n_classes = len(self._partition)
+        self._partition.remove(self._bits.remove(atom))
+        self.stats.classes_merged += n_classes - len(self._partition)
+        self.stats.record("remove", len(self._partition))
+        self._invalidate_computable()
+
+    @typechecked
+    def remove_label(self, label: Union[Label, str]):
+        label = self._get_derived_label(label)
+        self._remove_from_derived_labels(label)
+        # only classes that were separated by nothing but the removed label merge again
+        self._merge()
+        self._invalidate_computable()
+
+    @typechecked
+    def replace_label(self, old_label: Union[Label, str], new_label: Label):
+        old_label = self._get_derived_label(old_label)
+        mask = self._check_label(new_label, replaced=old_label)
+        self._refine([mask])
+        self._remove_from_derived_labels(old_label)
+        self._add_to_derived_labels(new_label, mask)
+        self._merge()
+        self._invalidate_computable()
+
+    def _get_derived_label(self, label: Union[Label, str]) -> Label:
+        if isinstance(label, str):
+            return self.get_label_by_name(label)
+        if label not in self._derived_labels:
+            msg = f"{label} not part of collection"
+            raise ValueError(msg)
+        return label
+
+    def _remove_from_derived_labels(self, label: Label):
+        self._derived_labels.remove(label)
+        del self._label_masks[label]
+        if label.name is not None:
+            del self._labels_by_name[label.name]
+        same_content = self._labels_by_content[label.included]
+        same_content.remove(label)
+        if len(same_content) == 0:
+            del self._labels_by_content[label.included]
+
+    def _check_label(self, label: Label, replaced: Optional[Label] = None) -> int:
+        mask = self._bits.to_mask(label.included)
+        if mask is None:
             msg = f"{set(label.included) - self._atoms} not part of collection"
             raise ValueError(msg)
+        if label.name is not None:
+            named = self._labels_by_name.get(label.name)
+            if named is not None and named not in (label, replaced):
+                msg = f"A different Label with name {label.name} is already part of this LabelCollection."
+                raise ValueError(msg)
+        return mask
+
+    @internal_typechecked
+    def _add_to_derived_labels(self, label: Label, mask: int):
+        if label.name is not None:
+            self._labels_by_name[label.name] = label
+        self._labels_by_content.setdefault(label.included, set()).add(label)
         self._derived_labels.add(label)
-        self._update_computable(label.included)
-        self._update_computable(frozenset(self._atoms - label.included))
+        self._label_masks[label] = mask
 
-    def _check_size(self):
-        size = len(self.get_computable_sets())
-        if size >= self._warn_size:
+    def _check_size(self, size: int):
+        # only warns if no hard limit is set on the number of sets
+        if self.budget.max_sets is None and size >= self._warn_size:
             self._increase_warn_size()
             msg = (
                 f"Your collection of computable sets is getting big. "
@@ -218,59 +466,9 @@ class LabelCollection:
             )
             warnings.warn(msg, stacklevel=1)
 
-    @typechecked
-    def _add_to_computable_atoms(self, new_atom: AtomicLabel):
-        new_computable_sets: Set[FrozenSet[AtomicLabel]] = set()
-        new_atoms: Set[AtomicLabel] = set()
-        for atomset in self._computable_sets:
-            new_set = atomset - {
-                new_atom,
-            }
-            if len(new_set) > 1:
-                new_computable_sets.add(new_set)
-            elif len(new_set) == 1:
-                [atom] = new_set
-                new_atoms.add(atom)
-        self._computable_sets = new_computable_sets
-        self._check_size()
-        self._computable_atoms.add(new_atom)
-        for atom in new_atoms:
-            self._add_to_computable_atoms(atom)
-
-    @typechecked
-    def _add_a_computable_set(self, added_set: FrozenSet[AtomicLabel]):
-        new_set = added_set - self._computable_atoms
-        if len(new_set) == 1:
-            [new_atom] = new_set
-            self._add_to_computable_atoms(new_atom)
-        elif len(new_set) > 1:
-            self._computable_sets.add(new_set)
-            self._check_size()
-
     def _increase_warn_size(self):
         self._warn_size = self._warn_size * 10
 
-    @typechecked
-    def _update_computable(self, added_set: FrozenSet[AtomicLabel]):
-        # compute the part of the `added_set` that is non-trivial by ignoring
-        # all the atomic labels that are already computable
-        new_set = added_set - self._computable_atoms
-        if len(new_set) == 1:  # this is a single atom
-            [new_atom] = new_set
-            self._add_to_computable_atoms(new_atom)
-        elif len(new_set) > 1:
-            newly_computable_it1 = {
-                new_set,
-            }
-            for old_set in self._computable_sets:
-                newly_computable_it1.update(computable(new_set, old_set))
-            newly_computable_it2 = set()
-            for set1, set2 in itertools.combinations(newly_computable_it1 - self._computable_sets, r=2):
-                newly_computable_it2.update(computable(set1, set2))
-            for computable_set in newly_computable_it1 | newly_computable_it2:
-                self._add_a_computable_set(computable_set)
-        # don't do anything if set is empty
-
     def can_compute_atoms(self) -> bool:
         return self._atoms == self.get_computable_atoms()
 
@@ -280,35 +478,106 @@ class LabelCollection:
             if test_label._atoms != self._atoms:
                 return False
             else:
-                for lbl in test_label:
-                    if not self.can_compute(lbl):
+                for lbl in test_label._derived_labels:
+                    if not self._can_compute(lbl):
                         return False
                 return True
-        elif isinstance(test_label, AtomicLabel):
-            included_set = frozenset(
-                [
-                    test_label,
-                ]
-            )
-        elif isinstance(test_label, Label):
-            included_set = test_label.included
-        elif check_type_bool(test_label, CollectionLike[AtomicLabel]):
-            included_set = frozenset(test_label)
-        else:
+        return self._can_compute(test_label)
+
+    @staticmethod
+    def _query_atoms(test_label: "AnyLabelType") -> FrozenSet[AtomicLabel]:
+        if isinstance(test_label, Label):
+            return test_label.included
+        atoms = as_atom_set(test_label)
+        if atoms is None:
             msg = f"Unknown type of `test_label`: {type(test_label)}"
             raise TypeError(msg)
-        included_set = included_set - self.get_computable_atoms()
+        return atoms if isinstance(atoms, frozenset) else frozenset(atoms)
+
+    @internal_typechecked
+    def _can_compute(self, test_label: "AnyLabelType") -> bool:
+        included_set = self._query_atoms(test_label)
+        memo = self._can_compute_memo
+        if self._memo_generation != self._generation:
+            memo.clear()
+            self._memo_generation = self._generation
+        result = memo.get(included_set)
+        if result is None:
+            result = self._is_computable(included_set)
+            memo[included_set] = result
+            if len(memo) > self.memo_size:
+                memo.popitem(last=False)
+        else:
+            memo.move_to_end(included_set)
+        return result
 
+    def _is_computable(self, included_set: FrozenSet[AtomicLabel]) -> bool:
         if len(included_set) == 0:
             return True
+        elif len(self._derived_labels) == 0:
+            return False
+        mask = self._bits.to_mask(included_set)
+        if mask is None:
+            return False
+        return self._partition.is_union(mask)
+
+    def can_compute_many(self, candidates: Union[np.ndarray, Sequence]) -> np.ndarray:
+        # Vectorized `can_compute` for many candidates, given either as a sequence of labels or atom sets or as a
+        # boolean matrix of shape (n_candidates, n_atoms) whose columns follow `get_atom_order()`. A candidate is
+        # computable iff it contains either all or none of the atoms of every class of the partition.
+        order, membership, sizes = self._class_membership()
+        if isinstance(candidates, np.ndarray):
+            matrix = np.asarray(candidates, dtype=bool)
+            if matrix.shape[1:] != (len(order),):
+                msg = f"Expected a matrix of shape (n_candidates, {len(order)}), got {matrix.shape}."
+                raise ValueError(msg)
+            valid = np.ones(matrix.shape[0], dtype=bool)
         else:
-            return included_set in self.get_computable_sets()
+            matrix, valid = self._membership_matrix(candidates, order)
+        if len(self._derived_labels) == 0:
+            return valid & ~matrix.any(axis=1)
+        counts = matrix.astype(np.int64) @ membership
+        return valid & np.all((counts == 0) | (counts == sizes), axis=1)
+
+    def _membership_matrix(self, candidates, order):
+        column = {atom: k for k, atom in enumerate(order)}
+        matrix = np.zeros((len(candidates), len(order)), dtype=bool)
+        valid = np.ones(len(candidates), dtype=bool)
+        for row, candidate in enumerate(candidates):
+            atoms = as_atom_set(candidate)
+            if atoms is None:
+                msg = f"Unknown type of candidate: {type(candidate)}"
+                raise TypeError(msg)
+            try:
+                matrix[row, [column[atom] for atom in atoms]] = True
+            except KeyError:
+                valid[row] = False
+        return matrix, valid
+
+    def _class_membership(self):
+        # atom order, one-hot matrix of shape (n_atoms, n_classes) and class sizes, cached per generation
+        if self._class_membership_cache is None or self._class_membership_cache[0] != self._generation:
+            positions = list(iter_bits(self._bits.universe))
+            classes = self._partition.get_classes()
+            membership = np.zeros((len(positions), len(classes)), dtype=np.int64)
+            for k, cls in enumerate(classes):
+                for col, pos in enumerate(positions):
+                    if cls >> pos & 1:
+                        membership[col, k] = 1
+            order = [self._bits.get_atom(pos) for pos in positions]
+            self._class_membership_cache = (self._generation, order, membership, membership.sum(axis=0))
+        return self._class_membership_cache[1:]
+
+    def get_atom_order(self) -> List[AtomicLabel]:
+        return self._bits.get_atoms()
+
+    def compile_lut(self, labels: LabelSelection = None) -> LabelLUT:
+        return LabelLUT.from_collection(self, labels)
 
     def contains_match(self, test_label: Label):
-        for lbl in self.get_derived_labels():
-            if lbl.match(test_label):
-                return True
-        return False
+        if not isinstance(test_label, Label):
+            return False
+        return test_label.included in self._labels_by_content
 
 
 AnyLabelType = Union[AtomicLabel, Label, Set[AtomicLabel]]
@@ -0,0 +1,178 @@
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, AbstractSet, Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from labelcomposer.label import AtomicLabel, Label, LabelCollection
+
+# unsigned volumes of at most this many bits index a table padded to their full range without clipping
+DIRECT_LOOKUP_BITS = 16
+
+LabelSelection = Optional[Sequence[Union[str, "Label"]]]
+
+
+def table_size(atoms: Iterable["AtomicLabel"]) -> int:
+    # width of a lookup table indexed by the indices of `atoms`
+    size = 0
+    for atom in atoms:
+        if atom.index is None or atom.index < 0:
+            msg = f"Cannot build a lookup table for {atom!r} without a non-negative index."
+            raise ValueError(msg)
+        size = max(size, atom.index + 1)
+    return size
+
+
+def membership_table(atom_sets: Sequence[AbstractSet["AtomicLabel"]], size: int, dtype: Any = bool) -> np.ndarray:
+    # row `k` marks the indices of the atoms in `atom_sets[k]`
+    table = np.zeros((len(atom_sets), size), dtype=dtype)
+    for row, atoms in enumerate(atom_sets):
+        table[row, [atom.index for atom in atoms]] = 1
+    return table
+
+
+def as_index_array(volume: Any) -> np.ndarray:
+    volume = np.asarray(volume)
+    if volume.dtype.kind not in "iu":
+        msg = f"Expected an integer array of atom indices, got dtype {volume.dtype}."
+        raise TypeError(msg)
+    return volume
+
+
+def clip_indices(volume: Any, size: int) -> np.ndarray:
+    # indices outside of [0, size) are clipped onto -1 or `size`, which both select the trailing column of `pad_table`
+    return np.clip(as_index_array(volume).astype(np.intp, copy=False), -1, size)
+
+
+def pad_table(table: np.ndarray, fill: Any = 0, width: Optional[int] = None) -> np.ndarray:
+    # appends columns of `fill` along the last axis up to `width`, by default a single one
+    extra = 1 if width is None else max(width - table.shape[-1], 0)
+    return np.concatenate([table, np.full((*table.shape[:-1], extra), fill, dtype=table.dtype)], axis=-1)
+
+
+def indexed_table(table: np.ndarray, volume: Any, fill: Any = 0) -> Tuple[np.ndarray, np.ndarray]:
+    # the padded table and the indices `lookup` indexes it with, clipped only for signed or wide dtypes
+    volume = as_index_array(volume)
+    bits = 8 * volume.dtype.itemsize
+    if volume.dtype.kind == "u" and bits <= DIRECT_LOOKUP_BITS:
+        return pad_table(table, fill, 1 << bits), volume
+    return pad_table(table, fill), clip_indices(volume, table.shape[-1])
+
+
+def lookup(table: np.ndarray, volume: Any, fill: Any = 0) -> np.ndarray:
+    # Looks up the atom indices of `volume` along the last axis of `table` in a single pass. All lookups share this
+    # policy: indices that are no atoms of the table, negative and out-of-range ones included, map to `fill`, e.g.
+    # False or an explicit unknown value.
+    padded, indices = indexed_table(table, volume, fill)
+    return padded[..., indices]
+
+
+class LabelLUT:
+    # Dense lookup table from atom index to label membership. Row `k` of `table` is the mask of atom indices that
+    # belong to `labels[k]`, so a whole volume of atom indices is composed into masks by a single fancy-indexing pass.
+    def __init__(self, labels: Sequence["Label"], table: np.ndarray):
+        if table.shape[0] != len(labels):
+            msg = f"Table of shape {table.shape} does not match {len(labels)} labels."
+            raise ValueError(msg)
+        self.labels: List["Label"] = list(labels)
+        self.table = table
+        self._rows: Dict[Union[str, "Label"], int] = {}
+        for row, lbl in enumerate(self.labels):
+            self._rows[lbl] = row
+            if lbl.name is not None:
+                self._rows[lbl.name] = row
+
+    @classmethod
+    def from_collection(cls, collection: "LabelCollection", labels: LabelSelection = None) -> "LabelLUT":
+        if labels is None:
+            selected = list(collection)
+        else:
+            selected = [collection.get_label_by_name(lbl) if isinstance(lbl, str) else lbl for lbl in labels]
+        atoms = collection.get_atoms()
+        size = table_size(atoms)
+        for lbl in selected:
+            if not lbl.included <= atoms:
+                msg = f"{set(lbl.included) - atoms} not part of collection"
+                raise ValueError(msg)
+        return cls(selected, membership_table([lbl.included for lbl in selected], size))
+
+    @property
+    def names(self) -> List[Optional[str]]:
+        return [lbl.name for lbl in self.labels]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def rows(self, labels: LabelSelection = None) -> List[int]:
+        if labels is None:
+            return list(range(len(self.labels)))
+        try:
+            return [self._rows[lbl] for lbl in labels]
+        except KeyError as e:
+            msg = f"{e.args[0]} is not part of this lookup table."
+            raise ValueError(msg) from None
+
+    def select(self, labels: LabelSelection = None) -> np.ndarray:
+        if labels is None:
+            return self.table
+        return self.table[self.rows(labels)]
+
+    def share(self) -> "SharedLabelLUT":
+        # copy of this lookup table backed by shared memory, which pickles to a handle instead of the table
+        return SharedLabelLUT.create(self.labels, self.table)
+
+    def apply(self, volume: np.ndarray, labels: LabelSelection = None) -> np.ndarray:
+        # returns a boolean array of shape (n_labels, *volume.shape), indices that are no atoms are outside all labels
+        return lookup(self.select(labels), volume)
+
+
+class SharedLabelLUT(LabelLUT):
+    # Lookup table in a `multiprocessing.shared_memory` block. Pickling only sends the name of the block, so every
+    # process that unpickles it maps the same read-only copy. The creating process owns the block and has to `unlink`
+    # it once no process needs it anymore.
+    def __init__(
+        self, labels: Sequence["Label"], shm: shared_memory.SharedMemory, shape: Tuple[int, ...], *, owner: bool
+    ):
+        table = np.ndarray(shape, dtype=bool, buffer=shm.buf)
+        table.flags.writeable = False
+        super().__init__(labels, table)
+        self._shm = shm
+        self._owner = owner
+        self._shape = tuple(shape)
+        self._closed = False
+
+    @classmethod
+    def create(cls, labels: Sequence["Label"], table: np.ndarray) -> "SharedLabelLUT":
+        shm = shared_memory.SharedMemory(create=True, size=max(table.nbytes, 1))
+        np.ndarray(table.shape, dtype=bool, buffer=shm.buf)[...] = table
+        return cls(labels, shm, table.shape, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, labels: Sequence["Label"], shape: Tuple[int, ...]) -> "SharedLabelLUT":
+        # worker processes share the resource tracker of their parent, so attaching does not hand the block over to
+        # a tracker that would release it when the worker exits
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(labels, shm, shape, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def __reduce__(self):
+        return (SharedLabelLUT.attach, (self._shm.name, self.labels, self._shape))
+
+    def select(self, labels: LabelSelection = None) -> np.ndarray:
+        if self._closed:
+            msg = "Shared lookup table is closed."
+            raise ValueError(msg)
+        return super().select(labels)
+
+    def close(self):
+        # the view of the block has to be released before the block can be closed
+        self.table = None
+        self._closed = True
+        self._shm.close()
+
+    def unlink(self):
+        if self._owner:
+            self._shm.unlink()
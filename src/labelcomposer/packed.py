@@ -0,0 +1,133 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from labelcomposer.label import Label, LabelCollection
+from labelcomposer.lut import LabelLUT, LabelSelection, lookup
+from labelcomposer.stream import iter_chunks
+
+PACKED_DTYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+SIDECAR_VERSION = 1
+LabelKey = Union[str, Label]
+
+
+def packed_dtype(n_labels: int) -> np.dtype:
+    # smallest unsigned integer type with one bit per label
+    for dtype in PACKED_DTYPES:
+        if n_labels <= np.iinfo(dtype).bits:
+            return np.dtype(dtype)
+    msg = f"Cannot pack {n_labels} labels, at most {np.iinfo(np.uint64).bits} fit into one voxel."
+    raise ValueError(msg)
+
+
+def _sidecar(path: Union[str, Path]) -> Path:
+    return Path(path).with_suffix(".json")
+
+
+def _write_sidecar(path: Union[str, Path], labels: Sequence[LabelKey]) -> List[str]:
+    names = [lbl.name if isinstance(lbl, Label) else lbl for lbl in labels]
+    if any(name is None for name in names):
+        msg = "Only named labels can be saved in packed masks."
+        raise ValueError(msg)
+    _sidecar(path).write_text(json.dumps({"version": SIDECAR_VERSION, "labels": names}))
+    return names
+
+
+class PackedMasks:
+    # Label masks packed into one unsigned integer per voxel, bit `k` is set iff the voxel belongs to `labels[k]`.
+    # Indexing returns the packed masks of a region, `mask` decodes a single label and `decode` all of them.
+    def __init__(self, data: np.ndarray, labels: Sequence[LabelKey]):
+        if data.dtype not in PACKED_DTYPES or len(labels) > data.dtype.itemsize * 8:
+            msg = f"Cannot store {len(labels)} labels in packed masks of dtype {data.dtype}."
+            raise ValueError(msg)
+        self.data = data
+        self.labels: List[LabelKey] = list(labels)
+        self._bits: Dict[LabelKey, int] = {}
+        for bit, lbl in enumerate(self.labels):
+            self._bits[lbl] = bit
+            if isinstance(lbl, Label) and lbl.name is not None:
+                self._bits[lbl.name] = bit
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    def __getitem__(self, key: Any) -> "PackedMasks":
+        return PackedMasks(self.data[key], self.labels)
+
+    def bit(self, label: LabelKey) -> int:
+        try:
+            return self._bits[label]
+        except KeyError:
+            msg = f"{label} is not part of these packed masks."
+            raise ValueError(msg) from None
+
+    def mask(self, label: LabelKey) -> np.ndarray:
+        return (self.data & self.data.dtype.type(1 << self.bit(label))) != 0
+
+    def decode(self, labels: Optional[Sequence[LabelKey]] = None) -> np.ndarray:
+        # boolean array of shape (n_labels, *shape) as composed by a LabelLUT
+        bits = range(len(self.labels)) if labels is None else [self.bit(lbl) for lbl in labels]
+        weights = np.array([1 << bit for bit in bits], dtype=self.data.dtype)
+        return (self.data[np.newaxis] & weights.reshape(-1, *(1,) * self.data.ndim)) != 0
+
+    def save(self, path: Union[str, Path]):
+        save_packed(path, self.data, self.labels)
+
+
+class PackedLUT:
+    # Lookup table from atom index to the packed label memberships of that atom
+    def __init__(self, labels: Sequence[LabelKey], table: np.ndarray):
+        self.labels: List[LabelKey] = list(labels)
+        self.table = table
+
+    @classmethod
+    def from_lut(cls, lut: LabelLUT, labels: LabelSelection = None) -> "PackedLUT":
+        rows = lut.rows(labels)
+        dtype = packed_dtype(len(rows))
+        weights = np.array([1 << bit for bit in range(len(rows))], dtype=dtype)
+        table = np.bitwise_or.reduce(lut.table[rows] * weights[:, np.newaxis], axis=0).astype(dtype, copy=False)
+        return cls([lut.labels[row] for row in rows], table)
+
+    @classmethod
+    def from_collection(cls, collection: LabelCollection, labels: LabelSelection = None) -> "PackedLUT":
+        return cls.from_lut(collection.compile_lut(labels))
+
+    def apply(self, volume: np.ndarray) -> PackedMasks:
+        return PackedMasks(lookup(self.table, volume), self.labels)
+
+    def compose_to(self, source: Any, out: Any, chunk_shape: Sequence[int]) -> Any:
+        # streams the packed masks of `source` into `out` of the same shape, e.g. created with `create_packed`
+        data = out.data if isinstance(out, PackedMasks) else out
+        if tuple(data.shape) != tuple(source.shape):
+            msg = f"Output of shape {tuple(data.shape)} does not match expected shape {tuple(source.shape)}."
+            raise ValueError(msg)
+        for chunk in iter_chunks(source.shape, chunk_shape):
+            data[chunk] = lookup(self.table, source[chunk])
+        if isinstance(data, np.memmap):
+            data.flush()
+        return out
+
+
+def save_packed(path: Union[str, Path], data: np.ndarray, labels: Sequence[LabelKey]):
+    # writes the packed masks to `path`, which should end in .npy, next to a .json sidecar with the names of the labels
+    # in bit order
+    _write_sidecar(path, labels)
+    np.save(path, data)
+
+
+def open_packed(path: Union[str, Path], mode: str = "r") -> PackedMasks:
+    meta = json.loads(_sidecar(path).read_text())
+    if meta.get("version") != SIDECAR_VERSION:
+        msg = f"Unsupported version of packed masks: {meta.get('version')}"
+        raise ValueError(msg)
+    return PackedMasks(np.load(path, mmap_mode=mode), meta["labels"])
+
+
+def create_packed(path: Union[str, Path], labels: Sequence[LabelKey], shape: Sequence[int]) -> PackedMasks:
+    # memory-mapped packed masks on disk, to be filled e.g. with `PackedLUT.compose_to`
+    names = _write_sidecar(path, labels)
+    data = np.lib.format.open_memmap(path, mode="w+", dtype=packed_dtype(len(names)), shape=tuple(shape))
+    return PackedMasks(data, names)
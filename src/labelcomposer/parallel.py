@@ -0,0 +1,82 @@
+import mmap
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from labelcomposer.lut import LabelLUT, LabelSelection, lookup
+from labelcomposer.stream import Chunk, iter_chunks
+
+MemmapSpec = Tuple[str, np.dtype, Tuple[int, ...], int, str]
+
+# state of a worker process, set once per process by `_init_worker`
+_worker: Dict[str, Any] = {}
+
+
+def _memmap_spec(array: Any, name: str) -> MemmapSpec:
+    if not isinstance(array, np.memmap) or not isinstance(array.base, mmap.mmap) or array.filename is None:
+        msg = f"`{name}` has to be a np.memmap of a whole file to be shared with worker processes."
+        raise ValueError(msg)
+    order = "F" if array.flags.f_contiguous and not array.flags.c_contiguous else "C"
+    return (array.filename, array.dtype, array.shape, array.offset, order)
+
+
+def _open_memmap(spec: MemmapSpec, mode: str) -> np.memmap:
+    filename, dtype, shape, offset, order = spec
+    return np.memmap(filename, dtype=dtype, mode=mode, shape=shape, offset=offset, order=order)
+
+
+def _init_worker(table: np.ndarray, source_spec: MemmapSpec, out_spec: MemmapSpec):
+    _worker["table"] = table
+    _worker["source"] = _open_memmap(source_spec, "r")
+    _worker["out"] = _open_memmap(out_spec, "r+")
+
+
+def _compose_chunk(table: np.ndarray, source: Any, out: Any, chunk: Chunk):
+    out[(slice(None), *chunk)] = lookup(table, source[chunk])
+
+
+def _compose_chunk_in_worker(chunk: Chunk):
+    _compose_chunk(_worker["table"], _worker["source"], _worker["out"], chunk)
+    _worker["out"].flush()
+
+
+def compose_parallel(
+    lut: LabelLUT,
+    source: Any,
+    out: Any,
+    chunk_shape: Sequence[int],
+    labels: LabelSelection = None,
+    *,
+    max_workers: Optional[int] = None,
+    use_processes: bool = False,
+) -> Any:
+    # Composes the masks of `source` into `out` of shape (n_labels, *source.shape), fanning the chunks out to a pool.
+    # Every chunk writes a disjoint block of `out`, so the result does not depend on scheduling. Threads share all
+    # arrays directly; worker processes receive the lookup table once at startup and reopen `source` and `out`, which
+    # therefore have to be memory-mapped files.
+    table = lut.select(labels)
+    expected_shape = (table.shape[0], *source.shape)
+    if tuple(out.shape) != expected_shape:
+        msg = f"Output of shape {tuple(out.shape)} does not match expected shape {expected_shape}."
+        raise ValueError(msg)
+    chunks = list(iter_chunks(source.shape, chunk_shape))
+    executor: Executor
+    if use_processes:
+        source_spec = _memmap_spec(source, "source")
+        out_spec = _memmap_spec(out, "out")
+        out.flush()
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=(table, source_spec, out_spec)
+        )
+        with executor:
+            for _ in executor.map(_compose_chunk_in_worker, chunks):
+                pass
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        with executor:
+            for _ in executor.map(lambda chunk: _compose_chunk(table, source, out, chunk), chunks):
+                pass
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
@@ -0,0 +1,90 @@
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class AtomPartition:
+    # Equivalence classes of atoms under the signature "which derived labels contain me", with atoms and classes given
+    # as bitmasks. The unions of these classes are exactly the boolean algebra generated by the derived labels (and
+    # their complements).
+    def __init__(self, universe: int = 0):
+        self.universe = universe
+        self._classes: List[int] = [universe] if universe else []
+
+    @classmethod
+    def from_classes(cls, classes: Iterable[int]) -> "AtomPartition":
+        partition = cls()
+        for atoms in classes:
+            if atoms == 0 or atoms & partition.universe:
+                msg = "Classes of a partition have to be non-empty and disjoint."
+                raise ValueError(msg)
+            partition.universe |= atoms
+            partition._classes.append(atoms)
+        return partition
+
+    def get_classes(self) -> List[int]:
+        return self._classes
+
+    def get_singletons(self) -> int:
+        singletons = 0
+        for cls in self._classes:
+            if cls & (cls - 1) == 0:
+                singletons |= cls
+        return singletons
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+    def refine(self, splits: Iterable[int], check: Optional[Callable[[], None]] = None):
+        # `check` is called after every split and may raise to abort, the partition is only updated once all splits
+        # are applied
+        classes = self._classes
+        for split in splits:
+            if check is not None:
+                check()
+            new_classes = []
+            for cls in classes:
+                inside = cls & split
+                if inside in (0, cls):
+                    new_classes.append(cls)
+                else:
+                    new_classes.append(inside)
+                    new_classes.append(cls ^ inside)
+            classes = new_classes
+        self._classes = classes
+
+    def extend(self, new_atoms: int, covered: int):
+        # adds atoms that are not part of any of the splits so far, with `covered` the union of all those splits
+        new_atoms &= ~self.universe
+        if new_atoms == 0:
+            return
+        self.universe |= new_atoms
+        for k, cls in enumerate(self._classes):
+            if cls & covered == 0:
+                self._classes[k] = cls | new_atoms
+                return
+        self._classes.append(new_atoms)
+
+    def remove(self, atoms: int):
+        self.universe &= ~atoms
+        self._classes = [cls & ~atoms for cls in self._classes if cls & ~atoms]
+
+    def merge(self, splits: Iterable[int]):
+        # merges the classes that are no longer separated by any of the remaining `splits`
+        splits = list(splits)
+        merged: Dict[int, int] = {}
+        for cls in self._classes:
+            signature = 0
+            for k, split in enumerate(splits):
+                if cls & split:
+                    signature |= 1 << k
+            merged[signature] = merged.get(signature, 0) | cls
+        self._classes = list(merged.values())
+
+    def is_union(self, mask: int) -> bool:
+        # a set is a union of classes iff it contains every class it touches completely
+        if mask & ~self.universe:
+            return False
+        for cls in self._classes:
+            inside = cls & mask
+            if inside and inside != cls:
+                return False
+        return True
@@ -0,0 +1,134 @@
+from functools import partial
+from typing import AbstractSet, Callable, Dict, Iterator, List, Tuple
+
+from labelcomposer.bitset import iter_bits, popcount
+from labelcomposer.expression import And, Expr, LabelRef, Not, Or, Sub, resolve
+from labelcomposer.label import AnyLabelType, AtomicLabel, Label, LabelCollection, as_atom_set
+
+
+def _class_masks(collection: LabelCollection) -> Tuple[List[int], Dict[Label, int]]:
+    # expresses every derived label as a bitmask over the classes of the partition instead of over atoms
+    classes = collection._partition.get_classes()
+    label_masks = {}
+    for lbl, atom_mask in collection._label_masks.items():
+        label_masks[lbl] = sum(1 << k for k, cls in enumerate(classes) if cls & atom_mask)
+    return classes, label_masks
+
+
+def _class_term(k: int, universe: int, label_masks: Dict[Label, int]) -> Tuple[int, Expr]:
+    # a single class is the intersection of the labels containing it minus the labels that do not
+    inside = [lbl for lbl, mask in label_masks.items() if mask >> k & 1]
+    if len(inside) == 0:
+        # the class of atoms outside of all labels
+        expr: Expr = LabelRef(next(iter(label_masks)))
+        mask = next(iter(label_masks.values()))
+        for lbl, lbl_mask in label_masks.items():
+            if lbl_mask & ~mask:
+                expr = Or(expr, LabelRef(lbl))
+                mask |= lbl_mask
+        return universe & ~mask, Not(expr)
+    expr = LabelRef(inside[0])
+    mask = label_masks[inside[0]]
+    for lbl in inside[1:]:
+        if mask & ~label_masks[lbl]:
+            expr = And(expr, LabelRef(lbl))
+            mask &= label_masks[lbl]
+    for lbl, lbl_mask in label_masks.items():
+        if mask & lbl_mask and not lbl_mask >> k & 1:
+            expr = Sub(expr, LabelRef(lbl))
+            mask &= ~lbl_mask
+    return mask, expr
+
+
+def _combine(levels: List[Dict[int, Expr]], cost: int, universe: int) -> Iterator[Tuple[int, Callable[[], Expr]]]:
+    # yields the masks of all expressions with `cost` operations built from the previous levels, together with a
+    # factory for the expression so that it is only built for masks that have not been seen before
+    for mask, expr in levels[cost - 1].items():
+        yield universe & ~mask, partial(Not, expr)
+    for left_cost in range(cost):
+        right_cost = cost - 1 - left_cost
+        for left_mask, left in levels[left_cost].items():
+            for right_mask, right in levels[right_cost].items():
+                if left_cost <= right_cost:
+                    yield left_mask | right_mask, partial(Or, left, right)
+                    yield left_mask & right_mask, partial(And, left, right)
+                yield left_mask & ~right_mask, partial(Sub, left, right)
+
+
+def plan(collection: LabelCollection, target: "AnyLabelType", max_search: int = 100_000) -> Expr:
+    # Finds an expression over the derived labels of `collection` that evaluates to the mask of `target`. Expressions
+    # are searched by increasing number of mask operations, so the first hit needs the fewest operations. If the budget
+    # of `max_search` candidate expressions runs out first, the target is covered greedily by the expressions found.
+    atoms = as_atom_set(target)
+    if atoms is None:
+        msg = f"Unknown type of `target`: {type(target)}"
+        raise TypeError(msg)
+    if not collection.can_compute(set(atoms)):
+        msg = f"{target} cannot be computed from this LabelCollection."
+        raise ValueError(msg)
+    if len(atoms) == 0:
+        msg = "Cannot plan the empty set of atoms."
+        raise ValueError(msg)
+    expr = _search(collection, atoms, max_search)
+    # cheap safeguard against plans that do not produce the target
+    if resolve(expr, collection.get_atoms()) != frozenset(atoms):
+        msg = f"Plan {expr} does not resolve to {target}."
+        raise RuntimeError(msg)
+    return expr
+
+
+def _search(collection: LabelCollection, atoms: AbstractSet[AtomicLabel], max_search: int) -> Expr:
+    classes, label_masks = _class_masks(collection)
+    atom_mask = collection._bits.to_mask(atoms)
+    goal = sum(1 << k for k, cls in enumerate(classes) if cls & atom_mask)
+    universe = (1 << len(classes)) - 1
+
+    # levels[c] holds the expressions with c operations that produce a mask not seen at a lower cost
+    found: Dict[int, Expr] = {}
+    found_cost: Dict[int, int] = {}
+    levels: List[Dict[int, Expr]] = [{}]
+    for lbl, mask in label_masks.items():
+        if mask not in found:
+            found[mask] = levels[0][mask] = LabelRef(lbl)
+            found_cost[mask] = 0
+    if goal in found:
+        return found[goal]
+    budget = max_search
+    cost = 0
+    while budget > 0 and len(levels[-1]) > 0:
+        cost += 1
+        level: Dict[int, Expr] = {}
+        levels.append(level)
+        for mask, expr in _combine(levels, cost, universe):
+            budget -= 1
+            if mask not in found:
+                found[mask] = level[mask] = expr()
+                found_cost[mask] = cost
+                if mask == goal:
+                    return found[mask]
+            if budget <= 0:
+                break
+
+    # greedy cover of the goal by the expressions found so far, completed by the canonical term of each class
+    uncovered = goal
+    parts: List[Expr] = []
+    costs = {mask: found_cost[mask] for mask in found if mask and not mask & ~goal}
+    while uncovered:
+        best, best_key = 0, (0, 0)
+        for mask, mask_cost in costs.items():
+            key = (popcount(mask & uncovered), -mask_cost)
+            if key > best_key:
+                best, best_key = mask, key
+        if best:
+            parts.append(found[best])
+            uncovered &= ~best
+            del costs[best]
+        else:
+            k = next(iter_bits(uncovered))
+            mask, expr = _class_term(k, universe, label_masks)
+            parts.append(found[mask] if mask in found else expr)
+            uncovered &= ~mask
+    result = parts[0]
+    for part in parts[1:]:
+        result = Or(result, part)
+    return result
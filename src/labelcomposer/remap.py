@@ -0,0 +1,83 @@
+from typing import Dict, FrozenSet, Iterable, List, Mapping
+
+import numpy as np
+
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+from labelcomposer.lut import LabelSelection, lookup, table_size
+
+# value of the multi-channel lookup where membership in a target label cannot be decided
+UNKNOWN = -1
+
+
+class Remapping:
+    # Translates volumes annotated with the atoms of `source` into the labels of `target`. `correspondence` maps every
+    # source atom to the target atoms it stands for, e.g. a source "Mito" atom to the target atoms "Mito mem", "Mito
+    # lum" and "Mito Ribo". A target label can be computed from the source iff it is a union of the images of source
+    # atoms, which is decided with `can_compute` on the source atoms translated into the target hierarchy.
+    def __init__(
+        self,
+        source: LabelCollection,
+        target: LabelCollection,
+        correspondence: Mapping[AtomicLabel, Iterable[AtomicLabel]],
+        labels: LabelSelection = None,
+        unknown: int = UNKNOWN,
+    ):
+        images: Dict[AtomicLabel, FrozenSet[AtomicLabel]] = {}
+        if unknown in (0, 1):
+            msg = f"`unknown` has to differ from the membership values 0 and 1, got {unknown}."
+            raise ValueError(msg)
+        covered: FrozenSet[AtomicLabel] = frozenset()
+        for atom, image in correspondence.items():
+            if atom not in source.get_atoms():
+                msg = f"{atom} not part of source collection"
+                raise ValueError(msg)
+            images[atom] = frozenset(image)
+            if not images[atom] <= target.get_atoms():
+                msg = f"{set(images[atom]) - target.get_atoms()} not part of target collection"
+                raise ValueError(msg)
+            if len(images[atom]) == 0 or images[atom] & covered:
+                msg = f"The images of source atoms have to be non-empty and disjoint, got {set(images[atom])}."
+                raise ValueError(msg)
+            covered |= images[atom]
+        size = table_size(images)
+        max_index = max(table_size(covered) - 1, 0)
+        if labels is None:
+            self.labels: List[Label] = list(target)
+        else:
+            self.labels = [target.get_label_by_name(lbl) if isinstance(lbl, str) else lbl for lbl in labels]
+        self.source = source
+        self.target = target
+        self.unknown = unknown
+        # the source atoms expressed in the target hierarchy: every image becomes a label over the covered atoms
+        self.translated = LabelCollection(covered, [Label(image, atom.name) for atom, image in images.items()])
+        self.computable: Dict[Label, bool] = {
+            lbl: self.translated.can_compute(set(lbl.included & covered)) for lbl in self.labels
+        }
+
+        # source indices without a correspondence are unknown, as are indices that are no atoms at all
+        self.channel_table = np.full(
+            (len(self.labels), size), unknown, dtype=np.result_type(np.int8, np.min_scalar_type(unknown))
+        )
+        for atom, image in images.items():
+            for row, lbl in enumerate(self.labels):
+                if image <= lbl.included:
+                    self.channel_table[row, atom.index] = 1
+                elif not image & lbl.included:
+                    self.channel_table[row, atom.index] = 0
+        dtype = np.result_type(np.min_scalar_type(max_index), np.min_scalar_type(unknown))
+        self.index_table = np.full(size, unknown, dtype=dtype)
+        for atom, image in images.items():
+            if len(image) == 1:
+                self.index_table[atom.index] = next(iter(image)).index
+
+    def is_computable(self, label: Label) -> bool:
+        return self.computable[label]
+
+    def apply(self, volume: np.ndarray) -> np.ndarray:
+        # array of shape (n_labels, *volume.shape) with 1 inside a target label, 0 outside and `unknown` where it cannot
+        # be decided from the source annotation, which never happens for computable labels
+        return lookup(self.channel_table, volume, self.unknown)
+
+    def apply_index(self, volume: np.ndarray) -> np.ndarray:
+        # volume of target atom indices, with `unknown` where a source atom stands for more than one target atom
+        return lookup(self.index_table, volume, self.unknown)
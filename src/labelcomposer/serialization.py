@@ -0,0 +1,179 @@
+import json
+import os
+import struct
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Type, Union
+
+from labelcomposer.bitset import iter_bits
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+from labelcomposer.partition import AtomPartition
+
+# Binary layout (little endian): magic, format version, the atoms, the derived labels as bitmasks over the atoms and the
+# classes of the partition as bitmasks, so that loading does not need to recompute the computable structure.
+MAGIC = b"LBLC"
+VERSION = 1
+JSON_VERSION = 1
+
+
+def _compact(mask: int, columns: Dict[int, int]) -> int:
+    # renumbers the bits of `mask` from bit positions in the collection to consecutive positions
+    return sum(1 << columns[pos] for pos in iter_bits(mask))
+
+
+def _pack_str(value: str) -> bytes:
+    encoded = value.encode()
+    return struct.pack("<I", len(encoded)) + encoded
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self._data = memoryview(data)
+        self._offset = 0
+
+    def unpack(self, fmt: str) -> Tuple[Any, ...]:
+        values = struct.unpack_from(fmt, self._data, self._offset)
+        self._offset += struct.calcsize(fmt)
+        return values
+
+    def read(self, size: int) -> bytes:
+        if self._offset + size > len(self._data):
+            msg = "Unexpected end of data."
+            raise ValueError(msg)
+        value = bytes(self._data[self._offset : self._offset + size])
+        self._offset += size
+        return value
+
+    def read_str(self) -> str:
+        (size,) = self.unpack("<I")
+        return self.read(size).decode()
+
+    def at_end(self) -> bool:
+        return self._offset == len(self._data)
+
+
+def to_bytes(collection: LabelCollection) -> bytes:
+    positions = list(iter_bits(collection._bits.universe))
+    columns = {pos: col for col, pos in enumerate(positions)}
+    n_bytes = (len(positions) + 7) // 8
+    chunks = [MAGIC, struct.pack("<HI", VERSION, len(positions))]
+    for pos in positions:
+        atom = collection._bits.get_atom(pos)
+        chunks.append(_pack_str(atom.name))
+        chunks.append(struct.pack("<?q", atom.index is not None, atom.index or 0))
+    labels = sorted(collection._label_masks.items(), key=lambda item: (item[0].name is None, item[0].name or ""))
+    chunks.append(struct.pack("<I", len(labels)))
+    for lbl, mask in labels:
+        chunks.append(struct.pack("<?", lbl.name is not None))
+        if lbl.name is not None:
+            chunks.append(_pack_str(lbl.name))
+        chunks.append(_compact(mask, columns).to_bytes(n_bytes, "little"))
+    classes = collection._partition.get_classes()
+    chunks.append(struct.pack("<I", len(classes)))
+    for cls in classes:
+        chunks.append(_compact(cls, columns).to_bytes(n_bytes, "little"))
+    return b"".join(chunks)
+
+
+def from_bytes(data: bytes, cls: Type[LabelCollection] = LabelCollection) -> LabelCollection:
+    reader = _Reader(data)
+    try:
+        if reader.read(len(MAGIC)) != MAGIC:
+            msg = "Data is not a serialized LabelCollection."
+            raise ValueError(msg)
+        version, n_atoms = reader.unpack("<HI")
+        if version != VERSION:
+            msg = f"Unsupported format version {version}, expected {VERSION}."
+            raise ValueError(msg)
+        n_bytes = (n_atoms + 7) // 8
+        atoms: List[AtomicLabel] = []
+        for _ in range(n_atoms):
+            name = reader.read_str()
+            has_index, index = reader.unpack("<?q")
+            atoms.append(AtomicLabel(name, index if has_index else None))
+        collection = cls(atoms)
+        if collection._bits.universe != (1 << n_atoms) - 1:
+            msg = "Serialized atoms are not unique."
+            raise ValueError(msg)
+        (n_labels,) = reader.unpack("<I")
+        labels: List[Tuple[Label, int]] = []
+        for _ in range(n_labels):
+            (has_name,) = reader.unpack("<?")
+            name: Optional[str] = reader.read_str() if has_name else None
+            mask = int.from_bytes(reader.read(n_bytes), "little")
+            if mask >> n_atoms:
+                msg = "Serialized label refers to unknown atoms."
+                raise ValueError(msg)
+            labels.append((Label(collection._bits.to_atoms(mask), name), mask))
+        (n_classes,) = reader.unpack("<I")
+        classes = [int.from_bytes(reader.read(n_bytes), "little") for _ in range(n_classes)]
+    except struct.error as e:
+        msg = f"Corrupt serialized LabelCollection: {e}"
+        raise ValueError(msg) from e
+    if not reader.at_end():
+        msg = "Unexpected trailing data."
+        raise ValueError(msg)
+    partition = AtomPartition.from_classes(classes)
+    if partition.universe != collection._bits.universe:
+        msg = "Serialized partition does not cover the atoms."
+        raise ValueError(msg)
+    for lbl, mask in labels:
+        if not partition.is_union(mask):
+            msg = f"{lbl} is inconsistent with the serialized partition."
+            raise ValueError(msg)
+        collection._check_label(lbl)
+        collection._add_to_derived_labels(lbl, mask)
+    # the partition has to be exactly the one generated by the labels, a finer one would claim more computable sets
+    signatures = set()
+    for atoms in classes:
+        signature = sum(1 << k for k, (_, mask) in enumerate(labels) if atoms & mask)
+        if signature in signatures:
+            msg = "Serialized partition is finer than the one generated by the labels."
+            raise ValueError(msg)
+        signatures.add(signature)
+    collection._partition = partition
+    collection._invalidate_computable()
+    return collection
+
+
+def save(collection: LabelCollection, file: Union[str, os.PathLike, BinaryIO]):
+    data = to_bytes(collection)
+    if hasattr(file, "write"):
+        file.write(data)
+    else:
+        with open(file, "wb") as f:
+            f.write(data)
+
+
+def load(file: Union[str, os.PathLike, BinaryIO]) -> LabelCollection:
+    if hasattr(file, "read"):
+        return from_bytes(file.read())
+    with open(file, "rb") as f:
+        return from_bytes(f.read())
+
+
+def to_json(collection: LabelCollection, **kwargs) -> str:
+    # human-readable definition of the atoms and derived labels, labels refer to atoms by name
+    atoms = collection.get_atom_order()
+    if len({atom.name for atom in atoms}) != len(atoms):
+        msg = "Atom names have to be unique to export a LabelCollection to JSON."
+        raise ValueError(msg)
+    labels = sorted(collection.get_derived_labels(), key=lambda lbl: (lbl.name is None, lbl.name or ""))
+    definition = {
+        "version": JSON_VERSION,
+        "atoms": [{"name": atom.name, "index": atom.index} for atom in atoms],
+        "labels": [{"name": lbl.name, "atoms": sorted(atom.name for atom in lbl.included)} for lbl in labels],
+    }
+    return json.dumps(definition, **kwargs)
+
+
+def from_json(text: str) -> LabelCollection:
+    definition = json.loads(text)
+    if definition.get("version") != JSON_VERSION:
+        msg = f"Unsupported JSON version {definition.get('version')}, expected {JSON_VERSION}."
+        raise ValueError(msg)
+    atoms = {entry["name"]: AtomicLabel(entry["name"], entry["index"]) for entry in definition["atoms"]}
+    try:
+        labels = [Label([atoms[name] for name in entry["atoms"]], entry["name"]) for entry in definition["labels"]]
+    except KeyError as e:
+        msg = f"Label refers to unknown atom {e.args[0]}."
+        raise ValueError(msg) from None
+    return LabelCollection(list(atoms.values()), labels=labels)
@@ -0,0 +1,59 @@
+import time
+from dataclasses import dataclass, field, fields
+from typing import Callable, Dict, Optional
+
+
+class BudgetExceededError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Budget:
+    # Hard limits for a single operation of a LabelCollection, i.e. one refinement of the partition by a batch of
+    # labels or one materialization of the computable sets. Exceeding a limit raises a BudgetExceededError and leaves
+    # the collection as it was before the operation. Construction and refinement never enumerate sets, so `max_sets`
+    # only limits `get_computable_sets()`, while `max_seconds` limits both.
+    max_sets: Optional[int] = None
+    max_seconds: Optional[float] = None
+
+    def start(self) -> Callable[[int], None]:
+        # returns a check to call with the current number of sets while the operation makes progress
+        deadline = None if self.max_seconds is None else time.perf_counter() + self.max_seconds
+
+        def check(size: int = 0):
+            if self.max_sets is not None and size > self.max_sets:
+                msg = f"Number of computable sets exceeded the budget of {self.max_sets}."
+                raise BudgetExceededError(msg)
+            if deadline is not None and time.perf_counter() > deadline:
+                msg = f"Operation exceeded the time budget of {self.max_seconds} seconds."
+                raise BudgetExceededError(msg)
+
+        return check
+
+
+@dataclass
+class CollectionStats:
+    # Counters of the work done by a LabelCollection. `callback` is called with the name of the event and the stats
+    # after every operation, e.g. to forward the numbers to a logger or metrics system. One stats object can be shared
+    # by several collections to aggregate their counts.
+    refinements: int = 0
+    classes_created: int = 0
+    classes_merged: int = 0
+    sets_materialized: int = 0
+    refine_seconds: float = 0.0
+    materialize_seconds: float = 0.0
+    max_classes: int = 0
+    callback: Optional[Callable[[str, "CollectionStats"], None]] = field(default=None, repr=False, compare=False)
+
+    def record(self, event: str, n_classes: int):
+        self.max_classes = max(self.max_classes, n_classes)
+        if self.callback is not None:
+            self.callback(event, self)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "callback"}
+
+    def reset(self):
+        for f in fields(self):
+            if f.name != "callback":
+                setattr(self, f.name, f.default)
@@ -0,0 +1,49 @@
+import itertools
+from typing import Any, Iterator, Sequence, Tuple
+
+import numpy as np
+
+from labelcomposer.lut import LabelLUT, LabelSelection, lookup
+
+Chunk = Tuple[slice, ...]
+
+
+def iter_chunks(shape: Sequence[int], chunk_shape: Sequence[int]) -> Iterator[Chunk]:
+    if len(shape) != len(chunk_shape):
+        msg = f"Chunk shape {tuple(chunk_shape)} does not match the dimensionality of shape {tuple(shape)}."
+        raise ValueError(msg)
+    if any(size <= 0 for size in chunk_shape):
+        msg = f"Chunk shape {tuple(chunk_shape)} must be positive."
+        raise ValueError(msg)
+    starts = [range(0, extent, size) for extent, size in zip(shape, chunk_shape)]
+    for start in itertools.product(*starts):
+        yield tuple(slice(s, min(s + size, extent)) for s, size, extent in zip(start, chunk_shape, shape))
+
+
+def compose_chunks(
+    lut: LabelLUT, source: Any, chunk_shape: Sequence[int], labels: LabelSelection = None
+) -> Iterator[Tuple[Chunk, np.ndarray]]:
+    # `source` can be any array-like with a `shape` that supports slicing, e.g. an `np.memmap`. Only one chunk of the
+    # source and its composed masks are held in memory at a time.
+    table = lut.select(labels)
+    for chunk in iter_chunks(source.shape, chunk_shape):
+        yield chunk, lookup(table, source[chunk])
+
+
+def compose_to(lut: LabelLUT, source: Any, out: Any, chunk_shape: Sequence[int], labels: LabelSelection = None) -> Any:
+    # writes the masks into `out` of shape (n_labels, *source.shape), e.g. created with `open_output`
+    n_labels = len(lut.rows(labels))
+    expected_shape = (n_labels, *source.shape)
+    if tuple(out.shape) != expected_shape:
+        msg = f"Output of shape {tuple(out.shape)} does not match expected shape {expected_shape}."
+        raise ValueError(msg)
+    for chunk, masks in compose_chunks(lut, source, chunk_shape, labels):
+        out[(slice(None), *chunk)] = masks
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+
+def open_output(path: str, lut: LabelLUT, shape: Sequence[int], labels: LabelSelection = None) -> np.memmap:
+    n_labels = len(lut.rows(labels))
+    return np.lib.format.open_memmap(path, mode="w+", dtype=bool, shape=(n_labels, *shape))
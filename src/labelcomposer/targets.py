@@ -0,0 +1,36 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from labelcomposer.label import AnyLabelType, LabelCollection, as_atom_set
+from labelcomposer.lut import indexed_table, membership_table, table_size
+
+
+class TargetTransform:
+    # Maps batches of atom index volumes of a crop to masks of a fixed list of target labels. Whether the crop can
+    # compute each target is decided once when the transform is built, targets it cannot compute are all-zero and marked
+    # invalid in the validity mask, so that a loss can skip them. Calling the transform is a single lookup.
+    def __init__(self, targets: Sequence["AnyLabelType"], collection: LabelCollection, dtype: DTypeLike = bool):
+        self.targets: List["AnyLabelType"] = list(targets)
+        self.collection = collection
+        self.valid: np.ndarray = collection.can_compute_many(self.targets)
+        atom_sets = [as_atom_set(target) if valid else set() for target, valid in zip(self.targets, self.valid)]
+        self.table = membership_table(atom_sets, table_size(collection.get_atoms()), dtype)
+        self._rows = np.arange(len(self.targets))
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def __call__(self, volume: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # For `volume` of shape (B, *spatial) returns targets of shape (B, C, *spatial) and a read-only validity mask
+        # of the same shape that is broadcast from the C flags without allocating per voxel.
+        padded, indices = indexed_table(self.table, volume)
+        if indices.ndim == 0:
+            msg = "Expected a batch of volumes with a leading batch axis."
+            raise ValueError(msg)
+        spatial = (1,) * (indices.ndim - 1)
+        # indexing with the rows as a second axis writes the targets directly in (B, C, *spatial) order
+        targets = padded[self._rows.reshape(1, -1, *spatial), indices[:, np.newaxis]]
+        valid = np.broadcast_to(self.valid.reshape(1, -1, *spatial), targets.shape)
+        return targets, valid
@@ -0,0 +1,11 @@
+import pytest
+
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+
+
+@pytest.fixture
+def collection():
+    a = AtomicLabel("A", 1)
+    b = AtomicLabel("B", 2)
+    c = AtomicLabel("C", 3)
+    return LabelCollection([a, b, c], labels=[Label([a, b], "AB"), Label([b, c], "BC")])
@@ -0,0 +1,21 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+RUN = Path(__file__).parent.parent / "benchmarks" / "run.py"
+
+
+class TestBenchmarks:
+    def test_save_and_compare(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        command = [sys.executable, str(RUN), "organelles", "--repeat", "1"]
+        subprocess.run([*command, "--save", str(baseline)], check=True, capture_output=True)  # noqa: S603
+        results = json.loads(baseline.read_text())["results"]
+        assert "organelles/construction" in results
+        assert all(result["best"] > 0 for result in results.values())
+        # a huge tolerance, timings of a single repeat are too noisy to compare here
+        completed = subprocess.run(  # noqa: S603
+            [*command, "--compare", str(baseline), "--tolerance", "1000"], check=False, capture_output=True
+        )
+        assert completed.returncode == 0
@@ -0,0 +1,34 @@
+from labelcomposer.bitset import AtomBits, iter_bits, popcount
+from labelcomposer.label import AtomicLabel
+
+
+class TestBitset:
+    def test_bit_helpers(self):
+        assert popcount(0) == 0
+        assert popcount(0b1011) == 3
+        assert list(iter_bits(0b1011)) == [0, 1, 3]
+        assert list(iter_bits(1 << 100)) == [100]
+
+    def test_atom_bits(self):
+        a = AtomicLabel("A", 1)
+        b = AtomicLabel("B", 2)
+        c = AtomicLabel("C", 3)
+        bits = AtomBits([a, b])
+        assert len(bits) == 2
+        assert bits.add(c) == 0b100
+        assert bits.add(a) == 0b001
+        assert bits.universe == 0b111
+        assert bits.to_mask([a, c]) == 0b101
+        assert bits.to_mask([a, AtomicLabel("D", 4)]) is None
+        assert bits.to_atoms(0b110) == frozenset([b, c])
+        assert AtomicLabel("B", 2) in bits
+
+    def test_remove(self):
+        a = AtomicLabel("A", 1)
+        b = AtomicLabel("B", 2)
+        bits = AtomBits([a, b])
+        assert bits.remove(a) == 0b01
+        assert a not in bits
+        assert bits.universe == 0b10
+        assert bits.add(a) == 0b100
+        assert bits.get_atoms() == [b, a]
@@ -0,0 +1,51 @@
+import pytest
+
+from labelcomposer.cache import CollectionCache, computable_signature, group_by_computable
+from labelcomposer.frozen import FrozenLabelCollection
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+
+
+class TestCollectionCache:
+    def test_shared(self):
+        a = AtomicLabel("A", 1)
+        b = AtomicLabel("B", 2)
+        c = AtomicLabel("C", 3)
+        ab = Label([a, b], "AB")
+        bc = Label([b, c], "BC")
+        cache = CollectionCache()
+        first = cache.get([a, b, c], [ab, bc])
+        assert isinstance(first, FrozenLabelCollection)
+        assert cache.get((c, b, a), {bc, ab}) is first
+        prototype = LabelCollection([a, b, c])
+        assert cache.get_like(prototype, [ab, bc]) is first
+        assert cache.get([a, b, c], [ab]) is not first
+        assert len(cache) == 2
+        assert (cache.hits, cache.misses) == (2, 2)
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_group_by_computable(self):
+        a = AtomicLabel("A", 1)
+        b = AtomicLabel("B", 2)
+        c = AtomicLabel("C", 3)
+        cache = CollectionCache()
+        crops = {
+            "crop1": cache.get([a, b, c], [Label([a, b], "AB"), Label([a], "A")]),
+            "crop2": cache.get([a, b, c], [Label([c], "C"), Label([b], "B")]),
+            "crop3": cache.get([a, b, c], [Label([a, b], "AB")]),
+            "crop4": cache.get([a, b, c], [Label([c], "other name")]),
+            "crop5": cache.get([a, b, c]),
+        }
+        groups = group_by_computable(crops)
+        assert sorted(groups.values()) == [["crop1", "crop2"], ["crop3", "crop4"], ["crop5"]]
+        assert computable_signature(crops["crop3"]) == frozenset([frozenset([a, b]), frozenset([c])])
+        assert computable_signature(crops["crop5"]) == frozenset()
+
+    def test_shared_state_is_immutable(self):
+        a = AtomicLabel("A", 1)
+        b = AtomicLabel("B", 2)
+        cache = CollectionCache()
+        shared = cache.get([a, b], [Label([a], "A")])
+        with pytest.raises(AttributeError):
+            shared.get_derived_labels().clear()
+        assert cache.get([a, b], [Label([a], "A")]).can_compute(a)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from labelcomposer.counts import LabelCounts, atom_histogram
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+
+
+@pytest.fixture
+def hierarchy():
+    a = AtomicLabel("A", 1)
+    b = AtomicLabel("B", 2)
+    c = AtomicLabel("C", 3)
+    d = AtomicLabel("D", 4)
+    return LabelCollection([a, b, c, d], [Label([a, b], "AB"), Label([c, d])])
+
+
+class TestAtomHistogram:
+    def test_chunked(self):
+        volume = np.random.default_rng(0).integers(0, 7, (9, 10, 11))
+        expected = np.bincount(volume.ravel())
+        np.testing.assert_array_equal(atom_histogram(volume), expected)
+        np.testing.assert_array_equal(atom_histogram(volume, (4, 4, 4)), expected)
+        assert len(atom_histogram(volume, minlength=20)) == 20
+
+    def test_invalid(self):
+        with pytest.raises(TypeError):
+            atom_histogram(np.zeros(3))
+        with pytest.raises(ValueError):
+            atom_histogram(np.array([-1, 2]))
+
+    def test_outside(self):
+        volume = np.array([-3, -1, 0, 2, 2, 5, 9])
+        np.testing.assert_array_equal(atom_histogram(volume, size=3), [1, 0, 2, 4])
+        np.testing.assert_array_equal(atom_histogram(volume, (2,), size=3), [1, 0, 2, 4])
+
+
+class TestLabelCounts:
+    def test_counts(self, hierarchy):
+        volume = np.array([[-1, 1, 1, 2], [2, 2, 3, 4], [4, 4, 4, 9]])
+        counts = LabelCounts.from_volume(hierarchy, volume, chunk_shape=(2, 2))
+        atoms = {atom.name: count for atom, count in counts.atoms.items()}
+        assert atoms == {"A": 2, "B": 3, "C": 1, "D": 4}
+        assert counts.count("AB") == 5
+        unnamed = next(lbl for lbl in hierarchy.get_derived_labels() if lbl.name is None)
+        assert counts.labels[unnamed] == 5
+        assert counts.count(unnamed) == 5
+        assert counts.count(set(hierarchy.get_atoms())) == 10
+        assert counts.count(set()) == 0
+        assert counts.total == 12
+        with pytest.raises(ValueError):
+            counts.count({AtomicLabel("A", 1)})
+        with pytest.raises(TypeError):
+            counts.count(3)
+
+    def test_short_histogram(self, hierarchy):
+        counts = LabelCounts(hierarchy, np.array([5, 1]))
+        assert counts.count("AB") == 1
+        assert counts.count(set(hierarchy.get_atoms())) == 1
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from labelcomposer.expression import And, LabelRef, Not, Or, Sub, evaluate, lazy
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+
+
+class TestEvaluate:
+    def test_shared_intermediates(self):
+        a = Label([AtomicLabel("A")], "A")
+        b = Label([AtomicLabel("B")], "B")
+        masks = {"A": np.array([True, True, False, False]), b: np.array([True, False, True, False])}
+        shared = Or(LabelRef(a), LabelRef(b))
+        expr = And(Sub(shared, LabelRef(b)), Not(Not(shared)))
+        assert expr.n_ops == 5
+        np.testing.assert_array_equal(evaluate(expr, masks), [False, True, False, False])
+        np.testing.assert_array_equal(masks["A"], [True, True, False, False])
+        np.testing.assert_array_equal(masks[b], [True, False, True, False])
+        with pytest.raises(KeyError):
+            evaluate(LabelRef(Label([AtomicLabel("C")], "C")), masks)
+
+
+class TestLazy:
+    def test_deep_shared_graph(self):
+        # every level refers to the previous one twice, which is only cheap if shared nodes are not walked per path
+        a = Label([AtomicLabel("A")], "A")
+        b = Label([AtomicLabel("B")], "B")
+        expr = lazy(a)
+        for _ in range(40):
+            expr = (expr | b) & expr
+        assert expr.n_ops == 80
+        assert expr.resolve() == a.included
+        masks = {"A": np.array([True, False]), "B": np.array([True, True])}
+        np.testing.assert_array_equal(evaluate(expr, masks), [True, False])
+        assert Or(LabelRef(a), LabelRef(b)) != And(LabelRef(a), LabelRef(b))
+        assert hash(Or(LabelRef(a), LabelRef(b))) == hash(Or(LabelRef(a), LabelRef(b)))
+
+    def test_build(self):
+        a = AtomicLabel("A", 1)
+        b = AtomicLabel("B", 2)
+        ab = Label([a, b], "AB")
+        expr = lazy(ab) - b + {a}
+        assert expr == Or(Sub(LabelRef(ab), LabelRef(Label([b], "B"))), LabelRef(Label([a])))
+        assert ab & lazy(a) == And(LabelRef(ab), LabelRef(Label([a], "A")))
+        assert ~lazy(ab) == Not(LabelRef(ab))
+        assert isinstance(ab - b, frozenset)
+        with pytest.raises(TypeError):
+            lazy(ab) | 1
+        with pytest.raises(TypeError):
+            lazy(1)
+
+    def test_resolve(self):
+        a = AtomicLabel("A", 1)
+        b = AtomicLabel("B", 2)
+        c = AtomicLabel("C", 3)
+        ab = Label([a, b], "AB")
+        assert (lazy(ab) - b).resolve() == frozenset([a])
+        assert (~lazy(ab)).resolve({a, b, c}) == frozenset([c])
+        with pytest.raises(ValueError):
+            (~lazy(ab)).resolve()
+
+    def test_apply(self):
+        ne = [AtomicLabel("NE mem", 1), AtomicLabel("NE lum", 2)]
+        chromatin = [AtomicLabel("H Chrom", 3), AtomicLabel("E Chrom", 4)]
+        nplasm = AtomicLabel("Nucleoplasm", 5)
+        cyto = AtomicLabel("Cytosol", 6)
+        hierarchy = LabelCollection(
+            [*ne, *chromatin, nplasm, cyto],
+            labels=[Label(ne, "NE"), Label(chromatin, "chromatin"), Label([*ne, *chromatin, nplasm], "Nucleus")],
+        )
+        nucleus = hierarchy.get_label_by_name("Nucleus")
+        expr = lazy(nucleus) - hierarchy.get_label_by_name("chromatin") + hierarchy.get_label_by_name("NE")
+        volume = np.random.default_rng(0).integers(1, 7, size=(5, 6, 7)).astype(np.uint8)
+        np.testing.assert_array_equal(expr.apply(volume), np.isin(volume, [1, 2, 5]))
+        np.testing.assert_array_equal((~expr).apply(volume, hierarchy.get_atoms()), np.isin(volume, [3, 4, 6]))
+        assert expr.compile().shape == (6,)
+        # indices that are no atoms, negative ones included, are outside of every expression
+        zero = AtomicLabel("zero", 0)
+        np.testing.assert_array_equal(lazy(Label([zero])).apply(np.array([-1, -9, 0, 7])), [False, False, True, False])
+        with pytest.raises(TypeError):
+            expr.apply(volume.astype(float))
+        with pytest.raises(ValueError):
+            lazy(AtomicLabel("X")).compile()
@@ -0,0 +1,79 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from labelcomposer.frozen import FrozenLabelCollection, freeze
+from labelcomposer.label import AtomicLabel, Label
+from labelcomposer.lut import SharedLabelLUT
+
+
+def apply_lut(lut, volume):
+    return lut.apply(volume)
+
+
+class TestFrozenLabelCollection:
+    def test_queries(self, collection):
+        frozen = freeze(collection)
+        assert isinstance(frozen, FrozenLabelCollection)
+        assert freeze(frozen) is frozen
+        assert frozen.get_derived_labels() == collection.get_derived_labels()
+        assert frozen.get_label_by_name("AB") == collection.get_label_by_name("AB")
+        assert frozen.can_compute(AtomicLabel("A", 1))
+        assert frozen.can_compute_atoms()
+        assert frozen.compile_lut() is frozen.compile_lut()
+
+    def test_immutable(self, collection):
+        frozen = freeze(collection)
+        with pytest.raises(TypeError):
+            frozen.add_atom(AtomicLabel("D", 4))
+        with pytest.raises(TypeError):
+            frozen.add_label(Label([AtomicLabel("A", 1)], "A"))
+        with pytest.raises(TypeError):
+            frozen.remove_label("AB")
+        thawed = frozen.thaw()
+        thawed.add_atom(AtomicLabel("D", 4))
+        assert len(frozen.get_atoms()) == 3
+        for view in (frozen.get_atoms(), frozen.get_derived_labels(), frozen.get_computable_sets()):
+            assert isinstance(view, frozenset)
+        assert isinstance(thawed.get_atoms(), set)
+
+    def test_pickle(self, collection):
+        frozen = freeze(collection)
+        loaded = pickle.loads(pickle.dumps(frozen))  # noqa: S301
+        assert isinstance(loaded, FrozenLabelCollection)
+        assert loaded.get_derived_labels() == frozen.get_derived_labels()
+        assert loaded.get_computable_atoms() == frozen.get_computable_atoms()
+
+    def test_threads(self, collection):
+        frozen = freeze(collection)
+        queries = [{AtomicLabel("A", 1)}, {AtomicLabel("C", 3)}, {AtomicLabel("A", 1), AtomicLabel("C", 3)}] * 100
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(frozen.can_compute, queries))
+        assert results == [frozen.can_compute(query) for query in queries]
+
+
+class TestSharedLabelLUT:
+    def test_shared(self, collection):
+        frozen = freeze(collection)
+        lut = frozen.compile_lut(shared=True)
+        try:
+            assert isinstance(lut, SharedLabelLUT)
+            np.testing.assert_array_equal(lut.table, frozen.compile_lut().table)
+            assert not lut.table.flags.writeable
+            volume = np.array([[1, 2], [3, 0]])
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                results = list(executor.map(apply_lut, [lut, lut], [volume, volume]))
+            for result in results:
+                np.testing.assert_array_equal(result, lut.apply(volume))
+            attached = pickle.loads(pickle.dumps(lut))  # noqa: S301
+            assert attached.name == lut.name
+            np.testing.assert_array_equal(attached.table, lut.table)
+            attached.close()
+            with pytest.raises(ValueError):
+                attached.apply(volume)
+            attached.unlink()
+        finally:
+            lut.close()
+            lut.unlink()
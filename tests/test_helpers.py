@@ -1,8 +1,12 @@
+import os
+import subprocess
+import sys
 from typing import List, Optional
 
+import pytest
 import typeguard
 
-from labelcomposer.helpers import check_type_bool
+from labelcomposer.helpers import check_type_bool, internal_typechecked
 
 
 @typeguard.typechecked
@@ -28,3 +32,24 @@ class TestTypecheck:
             collection_check_strategy=typeguard.CollectionCheckStrategy.ALL_ITEMS,
         )
         assert not check_type_bool("A", Optional[int])
+
+
+class TestInternalTypecheck:
+    def test_default(self):
+        @internal_typechecked
+        def f(x: int) -> int:
+            return x
+
+        with pytest.raises(typeguard.TypeCheckError):
+            f("A")
+
+    def test_public_only(self):
+        code = (
+            "from labelcomposer.label import AtomicLabel, LabelCollection\n"
+            "from labelcomposer.helpers import TYPECHECK_INTERNALS\n"
+            "assert not TYPECHECK_INTERNALS\n"
+            "hierarchy = LabelCollection([AtomicLabel('A')])\n"
+            "hierarchy._add_atoms([AtomicLabel('B')])\n"
+        )
+        env = dict(os.environ, LABELCOMPOSER_TYPECHECK="public")
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)  # noqa: S603
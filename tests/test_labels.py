@@ -1,9 +1,11 @@
+import pickle
 from itertools import combinations
 
+import numpy as np
 import pytest
 from typeguard import TypeCheckError
 
-from labelcomposer.label import AtomicLabel, Label, LabelCollection
+from labelcomposer.label import AtomicLabel, Label, LabelCollection, as_atom_set
 
 
 class TestAtomicLabel:
@@ -63,6 +65,26 @@ class TestAtomicLabel:
         assert 1 != a
         assert hash(a) != hash(1)
 
+    def test_interning(self):
+        a1 = AtomicLabel("A", 1)
+        assert AtomicLabel("A", 1) is a1
+        assert AtomicLabel(b"A", 1) is a1
+        assert AtomicLabel("A") is not a1
+        assert not hasattr(a1, "__dict__")
+
+    def test_immutable(self):
+        a = AtomicLabel("A", 1)
+        with pytest.raises(AttributeError):
+            a.name = "B"
+        with pytest.raises(AttributeError):
+            a.index = 2
+        with pytest.raises(AttributeError):
+            del a.name
+
+    def test_pickle(self):
+        a = AtomicLabel("A", 1)
+        assert pickle.loads(pickle.dumps(a)) is a  # noqa: S301
+
     def test_string(self):
         a = AtomicLabel("A")
         b = AtomicLabel("BLA", 1)
@@ -181,6 +203,27 @@ class TestLabel:
         ab2 = abcd - Label([c, d])
         assert ab1 == ab2
 
+    def test_and(self):
+        a = AtomicLabel("A")
+        b = AtomicLabel("B")
+        c = AtomicLabel("C")
+        abc = Label([a, b, c], "ABC")
+        assert abc & a == frozenset([a])
+        assert abc & [b, c, AtomicLabel("D")] == frozenset([b, c])
+        assert abc & Label([a, c]) == frozenset([a, c])
+
+    def test_operator_type_errors(self):
+        a = AtomicLabel("A")
+        ab = Label([a, AtomicLabel("B")], "AB")
+        with pytest.raises(TypeError):
+            ab | 1
+        with pytest.raises(TypeError):
+            ab - [a, 1]
+        with pytest.raises(TypeError):
+            ab & "A"
+        with pytest.raises(TypeError):
+            ab + [a]  # noqa: RUF005
+
 
 class TestLabelCollection:
     def test_basic_usage(self):
@@ -214,6 +257,180 @@ class TestLabelCollection:
         assert hierarchy2.get_atoms() == {a, b, c}
         assert len(hierarchy2.get_derived_labels()) == 0
 
+    def test_add_atom(self):
+        a = AtomicLabel("A")
+        b = AtomicLabel("B")
+        c = AtomicLabel("C")
+        d = AtomicLabel("D")
+        e = AtomicLabel("E")
+        hierarchy = LabelCollection([a, b, c], labels=[Label([a, b], "AB"), Label([a], "A")])
+        assert hierarchy.get_computable_atoms() == {a, b, c}
+        hierarchy.add_atom(d)
+        assert hierarchy.get_atoms() == {a, b, c, d}
+        assert hierarchy.get_computable_atoms() == {a, b}
+        assert hierarchy.can_compute({c, d})
+        assert not hierarchy.can_compute(c)
+        hierarchy.add_atoms([e, d])
+        assert hierarchy.can_compute({c, d, e})
+        assert not hierarchy.can_compute({c, e})
+        hierarchy.add_label(Label([c], "C"))
+        hierarchy.add_atom(AtomicLabel("F"))
+        assert hierarchy.can_compute({d, e, AtomicLabel("F")})
+        assert hierarchy.get_computable_atoms() == {a, b, c}
+        with pytest.raises(TypeCheckError):
+            LabelCollection([a, "x"])
+        with pytest.raises(TypeCheckError):
+            hierarchy.add_atoms([AtomicLabel("G"), "x"])
+        with pytest.raises(TypeError):
+            hierarchy._add_atoms([AtomicLabel("G"), "x"])
+        assert AtomicLabel("G") not in hierarchy.get_atoms()
+
+    def test_add_labels(self):
+        a = AtomicLabel("A")
+        b = AtomicLabel("B")
+        c = AtomicLabel("C")
+        hierarchy = LabelCollection([a, b, c])
+        hierarchy.add_labels([Label([a, b], "AB"), Label([b, c], "BC")])
+        assert hierarchy.get_names() == ["AB", "BC"]
+        assert hierarchy.can_compute_atoms()
+        with pytest.raises(ValueError):
+            hierarchy.add_labels([Label([a], "A"), Label([b], "A")])
+        with pytest.raises(ValueError):
+            hierarchy.add_labels([Label([a], "A"), Label([AtomicLabel("D")], "D")])
+        with pytest.raises(TypeCheckError):
+            hierarchy.add_labels([Label([a], "A"), 5])
+        with pytest.raises(TypeCheckError):
+            LabelCollection([a], labels=[Label([a]), "x"])
+        with pytest.raises(TypeError):
+            hierarchy._add_labels([Label([a], "A"), "x"])
+        assert hierarchy.get_names() == ["AB", "BC"]
+
+    def test_remove_label(self):
+        a = AtomicLabel("A")
+        b = AtomicLabel("B")
+        c = AtomicLabel("C")
+        ab = Label([a, b], "AB")
+        bc = Label([b, c], "BC")
+        hierarchy = LabelCollection([a, b, c], labels=[ab, bc])
+        assert hierarchy.can_compute_atoms()
+        hierarchy.remove_label("BC")
+        assert hierarchy.get_derived_labels() == {ab}
+        assert hierarchy.get_names() == ["AB"]
+        assert not hierarchy.contains_match(bc)
+        assert hierarchy.get_computable_atoms() == {c}
+        assert not hierarchy.can_compute(a)
+        with pytest.raises(ValueError):
+            hierarchy.remove_label(bc)
+        hierarchy.remove_label(ab)
+        assert not hierarchy.can_compute(c)
+        assert hierarchy.get_computable_sets() == set()
+
+    def test_replace_label(self):
+        a = AtomicLabel("A")
+        b = AtomicLabel("B")
+        c = AtomicLabel("C")
+        ab = Label([a, b], "AB")
+        hierarchy = LabelCollection([a, b, c], labels=[ab, Label([c], "C")])
+        assert not hierarchy.can_compute(a)
+        new_ab = Label([a], "AB")
+        hierarchy.replace_label(ab, new_ab)
+        assert hierarchy.get_label_by_name("AB") == new_ab
+        assert hierarchy.can_compute(a)
+        assert hierarchy.can_compute(b)
+        with pytest.raises(ValueError):
+            hierarchy.replace_label("AB", Label([a, b], "C"))
+        with pytest.raises(ValueError):
+            hierarchy.replace_label("AB", Label([AtomicLabel("D")], "D"))
+        assert hierarchy.get_label_by_name("AB") == new_ab
+
+    def test_remove_atom(self):
+        a = AtomicLabel("A")
+        b = AtomicLabel("B")
+        c = AtomicLabel("C")
+        d = AtomicLabel("D")
+        hierarchy = LabelCollection([a, b, c, d], labels=[Label([a], "A")])
+        assert not hierarchy.can_compute(c)
+        with pytest.raises(ValueError):
+            hierarchy.remove_atom(a)
+        hierarchy.remove_atom(d)
+        assert hierarchy.get_atoms() == {a, b, c}
+        hierarchy.remove_atom(b)
+        assert hierarchy.can_compute_atoms()
+        assert not hierarchy.can_compute(d)
+        with pytest.raises(ValueError):
+            hierarchy.remove_atom(d)
+        hierarchy.add_atom(d)
+        assert hierarchy.can_compute({c, d})
+
+    def test_can_compute_memo(self, monkeypatch):
+        a = AtomicLabel("A")
+        b = AtomicLabel("B")
+        c = AtomicLabel("C")
+        hierarchy = LabelCollection([a, b, c], labels=[Label([a, b], "AB")])
+        monkeypatch.setattr(hierarchy, "memo_size", 2)
+        assert not hierarchy.can_compute(a)
+        assert hierarchy.can_compute({a, b})
+        assert hierarchy.can_compute(Label([c]))
+        assert len(hierarchy._can_compute_memo) == 2
+        assert frozenset([a]) not in hierarchy._can_compute_memo
+        hierarchy.add_label(Label([a], "A"))
+        assert hierarchy.can_compute(a)
+        assert len(hierarchy._can_compute_memo) == 1
+        hierarchy.remove_label("A")
+        assert not hierarchy.can_compute(a)
+        hierarchy.add_atom(AtomicLabel("D"))
+        assert not hierarchy.can_compute(Label([c]))
+
+    def test_can_compute_many(self):
+        a = AtomicLabel("A")
+        b = AtomicLabel("B")
+        c = AtomicLabel("C")
+        d = AtomicLabel("D")
+        hierarchy = LabelCollection([a, b, c, d])
+        np.testing.assert_array_equal(hierarchy.can_compute_many([set(), {a}]), [True, False])
+        hierarchy.add_labels([Label([a, b], "AB"), Label([b], "B")])
+        candidates = [Label([a]), {c, d}, [a, c], {b, c, d}, set(), {AtomicLabel("E")}, a]
+        expected = [hierarchy.can_compute(set(as_atom_set(candidate))) for candidate in candidates]
+        np.testing.assert_array_equal(hierarchy.can_compute_many(candidates), expected)
+        assert hierarchy.get_atom_order() == [a, b, c, d]
+        matrix = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 1, 1]], dtype=bool)
+        np.testing.assert_array_equal(hierarchy.can_compute_many(matrix), [True, False, True])
+        with pytest.raises(ValueError):
+            hierarchy.can_compute_many(matrix[:, :3])
+        with pytest.raises(TypeError):
+            hierarchy.can_compute_many([1])
+
+    def test_enumerate_computable(self):
+        a = AtomicLabel("A")
+        b = AtomicLabel("B")
+        c = AtomicLabel("C")
+        d = AtomicLabel("D")
+        hierarchy = LabelCollection([a, b, c, d])
+        assert hierarchy.count_computable() == 0
+        assert list(hierarchy.iter_computable()) == []
+        with pytest.raises(ValueError):
+            hierarchy.sample_computable()
+        hierarchy.add_labels([Label([a, b], "AB"), Label([b], "B")])
+        empty = LabelCollection([], labels=[Label([])])
+        assert empty.count_computable() == 0
+        with pytest.raises(ValueError):
+            empty.sample_computable()
+        assert hierarchy.count_computable() == 7
+        computable = set(hierarchy.iter_computable())
+        assert len(computable) == 7
+        assert frozenset([a, c, d]) in computable
+        for atoms in combinations([a, b, c, d], 2):
+            assert (frozenset(atoms) in computable) == hierarchy.can_compute(set(atoms))
+        for seed in range(10):
+            assert hierarchy.sample_computable(seed) in computable
+
+    def test_count_computable_large(self):
+        atoms = [AtomicLabel(f"A{k}", k) for k in range(200)]
+        hierarchy = LabelCollection(atoms, labels=[Label(atoms[:k], f"L{k}") for k in range(1, 100)])
+        assert hierarchy.count_computable() == 2**100 - 1
+        assert next(iter(hierarchy.iter_computable())) == frozenset([atoms[0]])
+        assert hierarchy.can_compute(set(hierarchy.sample_computable(0)))
+
     def test_computable_labels_2classes(self):
         a = AtomicLabel("A", 1)
         b = AtomicLabel("B", 2)
@@ -286,8 +503,8 @@ class TestLabelCollection:
             m_atom,
             n_atom,
         ]
-        with pytest.warns(UserWarning):
-            mylblset = LabelCollection(my_list, labels=[class1, class2, class3, class4])
+        mylblset = LabelCollection(my_list, labels=[class1, class2, class3, class4])
+        assert mylblset.can_compute_atoms()
 
         all_combos = []
         for indx in range(len(my_list) + 1):
@@ -295,6 +512,73 @@ class TestLabelCollection:
         for entry in all_combos:
             assert mylblset.can_compute(set(entry))
 
+    def test_lookup(self):
+        a = AtomicLabel("A")
+        b = AtomicLabel("B")
+        ab = Label([a, b], "AB")
+        b_lbl = Label([b], "B")
+        hierarchy = LabelCollection([a, b], labels=[ab, b_lbl])
+        assert hierarchy.get_label_by_name("AB") == ab
+        with pytest.raises(ValueError):
+            hierarchy.get_label_by_name("A")
+        assert list(hierarchy) == [ab, b_lbl]
+        assert hierarchy.contains_match(Label([b, a], "other"))
+        assert not hierarchy.contains_match(Label([a]))
+        hierarchy.add_label(Label([b, a], "AB"))
+        with pytest.raises(ValueError):
+            hierarchy.add_label(Label([a], "AB"))
+        assert hierarchy.get_label_by_name("AB") == ab
+
+    def test_unnamed_labels(self):
+        a = AtomicLabel("A", 1)
+        b = AtomicLabel("B", 2)
+        c = AtomicLabel("C", 3)
+        ab = Label([a, b], "AB")
+        unnamed_a = Label([a])
+        unnamed_bc = Label([b, c])
+        hierarchy = LabelCollection([a, b, c], labels=[unnamed_bc, ab, unnamed_a])
+        assert list(hierarchy) == [ab, unnamed_a, unnamed_bc]
+        assert hierarchy.compile_lut().labels == [ab, unnamed_a, unnamed_bc]
+        source = LabelCollection([a, b, c], labels=[ab])
+        assert not source.can_compute(Label([a]))
+        assert not source.can_compute(LabelCollection([a, b, c], labels=[unnamed_a]))
+        assert source.can_compute(LabelCollection([a, b, c], labels=[Label([c])]))
+
+    def test_computable_sets(self):
+        a = AtomicLabel("A")
+        b = AtomicLabel("B")
+        c = AtomicLabel("C")
+        d = AtomicLabel("D")
+        hierarchy = LabelCollection([a, b, c, d], labels=[Label([a, b], "AB")])
+        assert hierarchy.get_computable_atoms() == set()
+        assert hierarchy.get_computable_sets() == {frozenset([a, b]), frozenset([c, d]), frozenset([a, b, c, d])}
+        assert hierarchy.can_compute({a, b, c, d})
+        assert not hierarchy.can_compute({a, c})
+        assert not hierarchy.can_compute(AtomicLabel("E"))
+
+    def test_no_labels(self):
+        a = AtomicLabel("A")
+        b = AtomicLabel("B")
+        hierarchy = LabelCollection([a, b])
+        assert hierarchy.can_compute(set())
+        assert not hierarchy.can_compute({a, b})
+        assert hierarchy.get_computable_atoms() == set()
+        assert hierarchy.get_computable_sets() == set()
+
+    def test_computable_sets_warning(self):
+        atoms = [AtomicLabel(f"A{k}", k) for k in range(14)]
+        labels = [Label(atoms[k : k + 2], f"L{k}") for k in range(0, 14, 2)]
+        hierarchy = LabelCollection(atoms, labels=labels)
+        with pytest.warns(UserWarning):
+            assert len(hierarchy.get_computable_sets()) == 2**7 - 1
+
+    def test_many_atoms(self):
+        atoms = [AtomicLabel(f"A{k}", k) for k in range(64)]
+        labels = [Label([atom for atom in atoms if atom.index & (1 << bit)], f"bit{bit}") for bit in range(6)]
+        hierarchy = LabelCollection(atoms, labels=labels)
+        assert hierarchy.can_compute_atoms()
+        assert hierarchy.can_compute(set(atoms[::3]))
+
     def test_realistic(self):
         ecs = AtomicLabel("ECS", 1)
         pm = AtomicLabel("PM", 2)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+from labelcomposer.lut import lookup
+
+
+class TestLabelLUT:
+    def test_table(self, collection):
+        lut = collection.compile_lut()
+        assert lut.names == ["AB", "BC"]
+        assert lut.table.shape == (2, 4)
+        np.testing.assert_array_equal(lut.table[0], [False, True, True, False])
+        np.testing.assert_array_equal(lut.table[1], [False, False, True, True])
+
+    def test_apply(self, collection):
+        lut = collection.compile_lut()
+        volume = np.array([[0, 1, 2], [3, 2, 1]], dtype=np.uint8)
+        masks = lut.apply(volume)
+        assert masks.shape == (2, 2, 3)
+        assert masks.dtype == bool
+        for k, lbl in enumerate(lut.labels):
+            expected = np.isin(volume, [atom.index for atom in lbl.included])
+            np.testing.assert_array_equal(masks[k], expected)
+
+    def test_apply_selection(self, collection):
+        lut = collection.compile_lut()
+        volume = np.array([1, 2, 3])
+        masks = lut.apply(volume, labels=["BC", collection.get_label_by_name("AB")])
+        np.testing.assert_array_equal(masks, [[False, True, True], [True, True, False]])
+        with pytest.raises(ValueError):
+            lut.apply(volume, labels=["D"])
+        with pytest.raises(TypeError):
+            lut.apply(volume.astype(float))
+
+    def test_out_of_range(self, collection):
+        # indices that are no atoms are outside of every label, on either end of the table
+        lut = collection.compile_lut()
+        masks = lut.apply(np.array([-1, -7, 4, 300, 3]))
+        np.testing.assert_array_equal(masks, [[False] * 5, [False] * 4 + [True]])
+        filled = lookup(lut.table, np.array([-1, 9], dtype=np.int8), fill=True)
+        np.testing.assert_array_equal(filled, [[True, True]] * 2)
+        for dtype in (np.uint8, np.uint16, np.uint32, np.int64):
+            volume = np.array([1, 4, 255, 3], dtype=dtype)
+            masks = lookup(lut.table, volume, fill=True)
+            np.testing.assert_array_equal(masks, [[True, True, True, False], [False, True, True, True]])
+
+    def test_compile_selection(self, collection):
+        lut = collection.compile_lut(labels=["BC"])
+        assert lut.names == ["BC"]
+        assert lut.table.shape == (1, 4)
+
+    def test_missing_index(self):
+        a = AtomicLabel("A")
+        collection = LabelCollection([a], labels=[Label([a], "A")])
+        with pytest.raises(ValueError):
+            collection.compile_lut()
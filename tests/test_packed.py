@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+from labelcomposer.lut import LabelLUT
+from labelcomposer.packed import PackedLUT, PackedMasks, create_packed, open_packed, packed_dtype, save_packed
+
+
+@pytest.fixture
+def hierarchy():
+    mem = AtomicLabel("Mito mem", 1)
+    lum = AtomicLabel("Mito lum", 2)
+    ribo = AtomicLabel("Mito Ribo", 3)
+    cyto = AtomicLabel("Cytosol", 4)
+    return LabelCollection(
+        [mem, lum, ribo, cyto],
+        [Label([mem, lum, ribo], "Mito"), Label([mem], "Mito mem"), Label([ribo], "Mito Ribo"), Label([cyto], "Cyto")],
+    )
+
+
+class TestPacked:
+    def test_dtype(self):
+        assert packed_dtype(1) == np.uint8
+        assert packed_dtype(9) == np.uint16
+        assert packed_dtype(64) == np.uint64
+        with pytest.raises(ValueError):
+            packed_dtype(65)
+
+    def test_matches_lut(self, hierarchy):
+        lut = LabelLUT.from_collection(hierarchy)
+        packed_lut = PackedLUT.from_lut(lut)
+        volume = np.random.default_rng(0).integers(-2, 7, (6, 7, 8))
+        packed = packed_lut.apply(volume)
+        assert packed.data.dtype == np.uint8
+        assert packed.shape == volume.shape
+        np.testing.assert_array_equal(packed.decode(), lut.apply(volume))
+        np.testing.assert_array_equal(packed.mask("Mito"), lut.apply(volume, ["Mito"])[0])
+        np.testing.assert_array_equal(packed.decode(["Cyto", "Mito mem"]), lut.apply(volume, ["Cyto", "Mito mem"]))
+        np.testing.assert_array_equal(packed[2:4, :, ::2].decode(), lut.apply(volume[2:4, :, ::2]))
+        with pytest.raises(ValueError):
+            packed.mask("Golgi")
+
+    def test_many_labels(self):
+        atoms = [AtomicLabel(f"A{k}", k) for k in range(64)]
+        labels = [Label(atoms[: k + 1], f"L{k}") for k in range(64)]
+        packed_lut = PackedLUT.from_collection(LabelCollection(atoms, labels), [lbl.name for lbl in labels])
+        assert packed_lut.table.dtype == np.uint64
+        packed = packed_lut.apply(np.arange(64))
+        assert packed.mask("L63").all()
+        np.testing.assert_array_equal(packed.mask("L0"), np.arange(64) == 0)
+
+    def test_on_disk(self, hierarchy, tmp_path):
+        packed_lut = PackedLUT.from_collection(hierarchy, ["Mito", "Cyto"])
+        source = np.random.default_rng(1).integers(0, 5, (5, 9))
+        path = tmp_path / "masks.npy"
+        out = create_packed(path, packed_lut.labels, source.shape)
+        packed_lut.compose_to(source, out, (2, 4))
+        loaded = open_packed(path)
+        assert isinstance(loaded.data, np.memmap)
+        assert loaded.labels == ["Mito", "Cyto"]
+        np.testing.assert_array_equal(loaded.decode(), packed_lut.apply(source).decode())
+
+        save_packed(tmp_path / "copy.npy", loaded.data, loaded.labels)
+        np.testing.assert_array_equal(open_packed(tmp_path / "copy.npy").data, loaded.data)
+        with pytest.raises(ValueError):
+            save_packed(tmp_path / "unnamed.npy", loaded.data, [Label([AtomicLabel("Cytosol", 4)])])
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            PackedMasks(np.zeros(3, dtype=np.uint8), [f"L{k}" for k in range(9)])
+        with pytest.raises(ValueError):
+            PackedMasks(np.zeros(3, dtype=np.int8), ["L"])
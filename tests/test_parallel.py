@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from labelcomposer.parallel import compose_parallel
+from labelcomposer.stream import open_output
+
+
+@pytest.fixture
+def lut(collection):
+    return collection.compile_lut()
+
+
+@pytest.fixture
+def source(tmp_path):
+    volume = np.random.default_rng(0).integers(0, 4, size=(9, 7, 5)).astype(np.uint8)
+    source = np.lib.format.open_memmap(tmp_path / "source.npy", mode="w+", dtype=np.uint8, shape=volume.shape)
+    source[:] = volume
+    source.flush()
+    return source
+
+
+class TestComposeParallel:
+    def test_threads(self, lut, source):
+        out = np.zeros((2, *source.shape), dtype=bool)
+        compose_parallel(lut, source, out, (4, 4, 4), max_workers=3)
+        np.testing.assert_array_equal(out, lut.apply(np.asarray(source)))
+
+    def test_processes(self, lut, source, tmp_path):
+        out = open_output(str(tmp_path / "out.npy"), lut, source.shape, labels=["BC"])
+        compose_parallel(lut, source, out, (4, 3, 5), labels=["BC"], max_workers=2, use_processes=True)
+        expected = lut.apply(np.asarray(source), labels=["BC"])
+        np.testing.assert_array_equal(out, expected)
+        np.testing.assert_array_equal(np.load(tmp_path / "out.npy"), expected)
+
+    def test_processes_need_memmap(self, lut, source):
+        out = np.zeros((2, *source.shape), dtype=bool)
+        with pytest.raises(ValueError):
+            compose_parallel(lut, source, out, (4, 4, 4), use_processes=True)
+        with pytest.raises(ValueError):
+            compose_parallel(lut, source, out[:1], (4, 4, 4))
@@ -0,0 +1,61 @@
+from labelcomposer.partition import AtomPartition
+
+
+class TestAtomPartition:
+    def test_refine(self):
+        partition = AtomPartition(0b1111)
+        assert len(partition) == 1
+        partition.refine([0b0011])
+        assert set(partition.get_classes()) == {0b0011, 0b1100}
+        partition.refine([0b0110])
+        assert set(partition.get_classes()) == {0b0001, 0b0010, 0b0100, 0b1000}
+        assert partition.get_singletons() == 0b1111
+
+    def test_refine_batch(self):
+        partition = AtomPartition(0b1111)
+        partition.refine([0b0011, 0b0110])
+        assert set(partition.get_classes()) == {0b0001, 0b0010, 0b0100, 0b1000}
+
+    def test_refine_noop(self):
+        partition = AtomPartition(0b11)
+        partition.refine([0b11, 0])
+        partition.refine([])
+        assert partition.get_classes() == [0b11]
+        assert partition.get_singletons() == 0
+
+    def test_is_union(self):
+        partition = AtomPartition(0b111)
+        partition.refine([0b011])
+        assert partition.is_union(0b011)
+        assert partition.is_union(0b100)
+        assert partition.is_union(0b111)
+        assert partition.is_union(0)
+        assert not partition.is_union(0b001)
+        assert not partition.is_union(0b110)
+        assert not partition.is_union(0b1000)
+
+    def test_extend(self):
+        partition = AtomPartition(0b111)
+        partition.refine([0b001])
+        partition.extend(0b1000, 0b001)
+        assert set(partition.get_classes()) == {0b0001, 0b1110}
+        partition.extend(0b1001, 0b1111)
+        assert partition.universe == 0b1111
+        partition.extend(0b10000, 0b1111)
+        assert set(partition.get_classes()) == {0b0001, 0b1110, 0b10000}
+
+    def test_remove(self):
+        partition = AtomPartition(0b111)
+        partition.refine([0b001])
+        partition.remove(0b001)
+        assert partition.get_classes() == [0b110]
+        assert partition.universe == 0b110
+
+    def test_merge(self):
+        partition = AtomPartition(0b1111)
+        partition.refine([0b0011])
+        partition.refine([0b0110])
+        partition.merge([0b0011])
+        assert set(partition.get_classes()) == {0b0011, 0b1100}
+        partition.merge([])
+        assert partition.get_classes() == [0b1111]
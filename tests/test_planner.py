@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from labelcomposer.expression import LabelRef, Not, Sub, evaluate
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+from labelcomposer.planner import plan
+
+
+@pytest.fixture
+def nucleus():
+    nemem = AtomicLabel("NE mem", 1)
+    nelum = AtomicLabel("NE lum", 2)
+    hchrom = AtomicLabel("H Chrom", 3)
+    echrom = AtomicLabel("E Chrom", 4)
+    nplasm = AtomicLabel("Nucleoplasm", 5)
+    cyto = AtomicLabel("Cytosol", 6)
+    atoms = [nemem, nelum, hchrom, echrom, nplasm, cyto]
+    labels = [
+        Label([nemem, nelum], "NE"),
+        Label([nemem], "NE mem"),
+        Label([hchrom, echrom], "chromatin"),
+        Label([echrom], "E Chrom"),
+        Label([nemem, nelum, hchrom, echrom, nplasm], "Nucleus"),
+    ]
+    return LabelCollection(atoms, labels=labels)
+
+
+def atom_masks(collection, volume):
+    return {lbl.name: np.isin(volume, [atom.index for atom in lbl.included]) for lbl in collection}
+
+
+class TestPlan:
+    def test_leaf(self, nucleus):
+        expr = plan(nucleus, nucleus.get_label_by_name("NE"))
+        assert expr == LabelRef(nucleus.get_label_by_name("NE"))
+        assert expr.n_ops == 0
+
+    def test_single_operation(self, nucleus):
+        ne = LabelRef(nucleus.get_label_by_name("NE"))
+        ne_mem = LabelRef(nucleus.get_label_by_name("NE mem"))
+        nucleus_ref = LabelRef(nucleus.get_label_by_name("Nucleus"))
+        assert plan(nucleus, Label([AtomicLabel("NE lum", 2)])) == Sub(ne, ne_mem)
+        assert plan(nucleus, AtomicLabel("Cytosol", 6)) == Not(nucleus_ref)
+
+    def test_all_computable(self, nucleus):
+        volume = np.random.default_rng(0).integers(1, 7, size=(6, 5))
+        masks = atom_masks(nucleus, volume)
+        for target in nucleus.iter_computable():
+            expr = plan(nucleus, set(target))
+            expected = np.isin(volume, [atom.index for atom in target])
+            np.testing.assert_array_equal(evaluate(expr, masks), expected)
+
+    def test_greedy_fallback(self, nucleus):
+        volume = np.random.default_rng(1).integers(1, 7, size=(4, 4))
+        masks = atom_masks(nucleus, volume)
+        for target in nucleus.iter_computable():
+            expr = plan(nucleus, set(target), max_search=1)
+            expected = np.isin(volume, [atom.index for atom in target])
+            np.testing.assert_array_equal(evaluate(expr, masks), expected)
+
+    def test_not_computable(self, nucleus):
+        ribo = AtomicLabel("Ribo", 7)
+        nucleus.add_atom(ribo)
+        assert plan(nucleus, {ribo, AtomicLabel("Cytosol", 6)}) == Not(LabelRef(nucleus.get_label_by_name("Nucleus")))
+        with pytest.raises(ValueError):
+            plan(nucleus, ribo)
+        with pytest.raises(ValueError):
+            plan(nucleus, set())
+        with pytest.raises(TypeError):
+            plan(nucleus, 1)
+
+    def test_unnamed_labels(self):
+        a = AtomicLabel("A", 1)
+        b = AtomicLabel("B", 2)
+        c = AtomicLabel("C", 3)
+        d = AtomicLabel("D", 4)
+        unnamed = Label([a, b])
+        bc = Label([b, c], "BC")
+        collection = LabelCollection([a, b, c, d], labels=[unnamed, bc])
+        assert collection.can_compute(b)
+        expr = plan(collection, b)
+        assert expr.resolve(collection.get_atoms()) == {b}
+        assert expr.nodes() >= {LabelRef(unnamed), LabelRef(bc)}
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+from labelcomposer.remap import UNKNOWN, Remapping
+
+
+@pytest.fixture
+def hierarchies():
+    # the source annotates mitochondria as a whole, the target distinguishes membrane and lumen
+    ecs = AtomicLabel("ECS", 1)
+    mito = AtomicLabel("Mito", 2)
+    er = AtomicLabel("ER", 3)
+    source = LabelCollection([ecs, mito, er])
+    t_ecs = AtomicLabel("ecs", 4)
+    t_mem = AtomicLabel("mito mem", 5)
+    t_lum = AtomicLabel("mito lum", 6)
+    t_er = AtomicLabel("er", 7)
+    t_golgi = AtomicLabel("golgi", 8)
+    target = LabelCollection(
+        [t_ecs, t_mem, t_lum, t_er, t_golgi],
+        [
+            Label([t_ecs], "ecs"),
+            Label([t_mem, t_lum], "mito"),
+            Label([t_mem], "mito mem"),
+            Label([t_mem, t_er], "membranes"),
+            Label([t_er, t_golgi], "secretory"),
+        ],
+    )
+    correspondence = {ecs: [t_ecs], mito: [t_mem, t_lum], er: [t_er]}
+    return source, target, correspondence
+
+
+class TestRemapping:
+    def test_computable(self, hierarchies):
+        source, target, correspondence = hierarchies
+        remap = Remapping(source, target, correspondence)
+        assert [lbl.name for lbl in remap.labels] == ["ecs", "membranes", "mito", "mito mem", "secretory"]
+        computable = {lbl.name: value for lbl, value in remap.computable.items()}
+        assert computable == {"ecs": True, "mito": True, "mito mem": False, "membranes": False, "secretory": True}
+        assert remap.is_computable(target.get_label_by_name("mito"))
+
+    def test_apply(self, hierarchies):
+        source, target, correspondence = hierarchies
+        remap = Remapping(source, target, correspondence, labels=["mito", "mito mem", "secretory"])
+        volume = np.array([[1, 2], [3, 0], [9, -5]])
+        result = remap.apply(volume)
+        assert result.dtype == np.int8
+        assert result.shape == (3, 3, 2)
+        np.testing.assert_array_equal(result[0], [[0, 1], [0, UNKNOWN], [UNKNOWN, UNKNOWN]])
+        np.testing.assert_array_equal(result[1], [[0, UNKNOWN], [0, UNKNOWN], [UNKNOWN, UNKNOWN]])
+        np.testing.assert_array_equal(result[2], [[0, 0], [1, UNKNOWN], [UNKNOWN, UNKNOWN]])
+        np.testing.assert_array_equal(remap.apply(volume.astype(np.uint8))[:, :2], result[:, :2])
+
+    def test_apply_index(self, hierarchies):
+        source, target, correspondence = hierarchies
+        remap = Remapping(source, target, correspondence, unknown=255)
+        assert remap.index_table.dtype == np.uint8
+        volume = np.array([0, 1, 2, 3, 4], dtype=np.int16)
+        np.testing.assert_array_equal(remap.apply_index(volume), [255, 4, 255, 7, 255])
+        assert remap.channel_table.dtype == np.int16
+        assert remap.apply(volume)[:, [0, 4]].tolist() == [[255, 255]] * len(remap.labels)
+
+    def test_invalid(self, hierarchies):
+        source, target, correspondence = hierarchies
+        atoms = {atom.name: atom for atom in target.get_atoms()}
+        with pytest.raises(ValueError):
+            Remapping(source, target, {**correspondence, AtomicLabel("ER", 3): [atoms["ecs"]]})
+        with pytest.raises(ValueError):
+            Remapping(source, target, {AtomicLabel("other", 9): [atoms["ecs"]]})
+        with pytest.raises(ValueError):
+            Remapping(source, target, {AtomicLabel("ECS", 1): [AtomicLabel("other", 9)]})
+        with pytest.raises(TypeError):
+            Remapping(source, target, correspondence).apply(np.zeros(3))
+        with pytest.raises(ValueError):
+            Remapping(source, target, correspondence, unknown=0)
+
+    def test_unnamed_target_labels(self, hierarchies):
+        source, target, correspondence = hierarchies
+        atoms = {atom.name: atom for atom in target.get_atoms()}
+        unnamed = Label([atoms["mito mem"], atoms["mito lum"], atoms["er"]])
+        target.add_label(unnamed)
+        remap = Remapping(source, target, correspondence)
+        assert remap.labels[-1] == unnamed
+        assert remap.is_computable(unnamed)
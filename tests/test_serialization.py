@@ -0,0 +1,98 @@
+import io
+
+import pytest
+
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+from labelcomposer.partition import AtomPartition
+from labelcomposer.serialization import from_bytes, from_json, load, save, to_bytes, to_json
+
+
+@pytest.fixture
+def organelles():
+    a = AtomicLabel("A", 1)
+    b = AtomicLabel("B", 2)
+    c = AtomicLabel("C", 3)
+    d = AtomicLabel("D")
+    e = AtomicLabel("E", 5)
+    collection = LabelCollection([a, b, c, d, e], labels=[Label([a, b], "AB"), Label([b, c], "BC"), Label([d])])
+    collection.remove_atom(e)
+    return collection
+
+
+def assert_same(loaded, collection):
+    assert loaded.get_atoms() == collection.get_atoms()
+    assert loaded.get_derived_labels() == collection.get_derived_labels()
+    assert loaded.get_computable_atoms() == collection.get_computable_atoms()
+    assert loaded.get_computable_sets() == collection.get_computable_sets()
+
+
+class TestBinary:
+    def test_roundtrip(self, organelles):
+        data = to_bytes(organelles)
+        assert data[:4] == b"LBLC"
+        loaded = from_bytes(data)
+        assert_same(loaded, organelles)
+        assert loaded.can_compute(AtomicLabel("A", 1))
+        assert to_bytes(loaded) == data
+
+    def test_skips_refinement(self, organelles, monkeypatch):
+        data = to_bytes(organelles)
+
+        def fail(*_args):
+            raise AssertionError
+
+        monkeypatch.setattr("labelcomposer.partition.AtomPartition.refine", fail)
+        assert_same(from_bytes(data), organelles)
+
+    def test_files(self, organelles, tmp_path):
+        save(organelles, tmp_path / "collection.lblc")
+        assert_same(load(tmp_path / "collection.lblc"), organelles)
+        buffer = io.BytesIO()
+        save(organelles, buffer)
+        buffer.seek(0)
+        assert_same(load(buffer), organelles)
+
+    def test_corrupt(self, organelles):
+        data = to_bytes(organelles)
+        with pytest.raises(ValueError):
+            from_bytes(b"XXXX" + data[4:])
+        with pytest.raises(ValueError):
+            from_bytes(data[:-1])
+        with pytest.raises(ValueError):
+            from_bytes(data + b"\x00")
+        with pytest.raises(ValueError):
+            from_bytes(data[:4] + b"\x02\x00" + data[6:])
+        # spare bits of a label mask beyond the last atom
+        n_atoms = len(organelles.get_atoms())
+        offset = data.index(b"AB") + 2
+        with pytest.raises(ValueError):
+            from_bytes(data[:offset] + bytes([data[offset] | 1 << n_atoms]) + data[offset + 1 :])
+
+    def test_finer_partition(self):
+        a = AtomicLabel("A", 1)
+        b = AtomicLabel("B", 2)
+        c = AtomicLabel("C", 3)
+        collection = LabelCollection([a, b, c], labels=[Label([a, b], "AB")])
+        assert not collection.can_compute(a)
+        collection._partition = AtomPartition.from_classes([1, 2, 4])
+        with pytest.raises(ValueError):
+            from_bytes(to_bytes(collection))
+        collection._partition = AtomPartition.from_classes([7])
+        with pytest.raises(ValueError):
+            from_bytes(to_bytes(collection))
+
+
+class TestJSON:
+    def test_roundtrip(self, organelles):
+        text = to_json(organelles, indent=2)
+        assert '"AB"' in text
+        assert_same(from_json(text), organelles)
+
+    def test_unique_names(self):
+        collection = LabelCollection([AtomicLabel("A", 1), AtomicLabel("A", 2)])
+        with pytest.raises(ValueError):
+            to_json(collection)
+
+    def test_unknown_atom(self):
+        with pytest.raises(ValueError):
+            from_json('{"version": 1, "atoms": [], "labels": [{"name": "A", "atoms": ["A"]}]}')
@@ -0,0 +1,69 @@
+import warnings
+
+import pytest
+
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+from labelcomposer.stats import Budget, BudgetExceededError, CollectionStats
+
+
+def _pairs(n_atoms):
+    atoms = [AtomicLabel(f"A{k}", k) for k in range(n_atoms)]
+    labels = [Label(atoms[k : k + 2], f"L{k}") for k in range(0, n_atoms, 2)]
+    return atoms, labels
+
+
+class TestStats:
+    def test_counters(self):
+        events = []
+        stats = CollectionStats(callback=lambda event, _: events.append(event))
+        atoms, labels = _pairs(6)
+        hierarchy = LabelCollection(atoms, labels=labels, stats=stats)
+        assert hierarchy.stats is stats
+        assert stats.refinements == 1
+        assert stats.classes_created == 3
+        assert stats.max_classes == 3
+        assert events == ["extend", "refine"]
+
+        hierarchy.add_label(Label([atoms[0]], "A0"))
+        assert stats.classes_created == 4
+        hierarchy.remove_label("A0")
+        assert stats.classes_merged == 1
+        assert len(hierarchy.get_computable_sets()) == 2**3 - 1
+        assert stats.sets_materialized == 7
+        assert events[-3:] == ["refine", "merge", "materialize"]
+        assert stats.refine_seconds > 0
+        assert set(stats.as_dict()) >= {"refinements", "classes_created", "classes_merged", "sets_materialized"}
+
+        stats.reset()
+        assert stats.as_dict() == CollectionStats().as_dict()
+        assert stats.callback is not None
+
+    def test_shared_stats(self):
+        stats = CollectionStats()
+        for _ in range(3):
+            LabelCollection(*_pairs(4), stats=stats)
+        assert stats.refinements == 3
+
+
+class TestBudget:
+    def test_max_sets(self):
+        atoms, labels = _pairs(14)
+        hierarchy = LabelCollection(atoms, labels=labels, budget=Budget(max_sets=100))
+        with pytest.raises(BudgetExceededError):
+            hierarchy.get_computable_sets()
+        hierarchy.budget = Budget(max_sets=2**7)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            assert len(hierarchy.get_computable_sets()) == 2**7 - 1
+
+    def test_max_seconds(self):
+        atoms, labels = _pairs(6)
+        with pytest.raises(BudgetExceededError):
+            LabelCollection(atoms, labels=labels, budget=Budget(max_seconds=-1))
+        hierarchy = LabelCollection(atoms, labels=labels[:1])
+        hierarchy.budget = Budget(max_seconds=-1)
+        with pytest.raises(BudgetExceededError):
+            hierarchy.add_labels(labels[1:])
+        # an aborted refinement leaves the collection unchanged
+        assert hierarchy.get_derived_labels() == {labels[0]}
+        assert len(hierarchy._partition) == 2
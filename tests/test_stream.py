@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from labelcomposer.stream import compose_chunks, compose_to, iter_chunks, open_output
+
+
+@pytest.fixture
+def lut(collection):
+    return collection.compile_lut()
+
+
+class TestStream:
+    def test_iter_chunks(self):
+        chunks = list(iter_chunks((5, 4), (2, 3)))
+        assert len(chunks) == 6
+        assert chunks[0] == (slice(0, 2), slice(0, 3))
+        assert chunks[-1] == (slice(4, 5), slice(3, 4))
+        covered = np.zeros((5, 4), dtype=int)
+        for chunk in chunks:
+            covered[chunk] += 1
+        assert np.all(covered == 1)
+        with pytest.raises(ValueError):
+            list(iter_chunks((5, 4), (2,)))
+
+    def test_compose_chunks(self, lut):
+        volume = np.random.default_rng(0).integers(0, 4, size=(7, 5))
+        expected = lut.apply(volume)
+        for chunk, masks in compose_chunks(lut, volume, (3, 2)):
+            np.testing.assert_array_equal(masks, expected[(slice(None), *chunk)])
+
+    def test_compose_to_memmap(self, lut, tmp_path):
+        volume = np.random.default_rng(1).integers(0, 4, size=(6, 5, 4)).astype(np.uint8)
+        source = np.lib.format.open_memmap(tmp_path / "source.npy", mode="w+", dtype=np.uint8, shape=volume.shape)
+        source[:] = volume
+        out = open_output(str(tmp_path / "out.npy"), lut, volume.shape, labels=["BC"])
+        compose_to(lut, source, out, (4, 4, 4), labels=["BC"])
+        np.testing.assert_array_equal(np.load(tmp_path / "out.npy"), lut.apply(volume, labels=["BC"]))
+        with pytest.raises(ValueError):
+            compose_to(lut, source, out, (4, 4, 4))
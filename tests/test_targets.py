@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from labelcomposer.label import AtomicLabel, Label, LabelCollection
+from labelcomposer.lut import LabelLUT
+from labelcomposer.targets import TargetTransform
+
+
+@pytest.fixture
+def crop():
+    mem = AtomicLabel("Mito mem", 1)
+    lum = AtomicLabel("Mito lum", 2)
+    ribo = AtomicLabel("Mito Ribo", 3)
+    cyto = AtomicLabel("Cytosol", 4)
+    # the crop only annotates mitochondria as a whole
+    return LabelCollection([mem, lum, ribo, cyto], [Label([mem, lum, ribo], "Mito"), Label([cyto], "Cyto")])
+
+
+class TestTargetTransform:
+    def test_targets(self, crop):
+        atoms = {atom.name: atom for atom in crop.get_atoms()}
+        mito = crop.get_label_by_name("Mito")
+        targets = [mito, Label([atoms["Mito mem"]], "Mito mem"), atoms["Cytosol"], {AtomicLabel("Golgi", 5)}]
+        transform = TargetTransform(targets, crop)
+        assert len(transform) == 4
+        np.testing.assert_array_equal(transform.valid, [True, False, True, False])
+
+        volume = np.random.default_rng(0).integers(1, 5, (2, 3, 4, 5))
+        masks, valid = transform(volume)
+        assert masks.shape == valid.shape == (2, 4, 3, 4, 5)
+        assert masks.flags.c_contiguous
+        assert not valid.flags.writeable
+        expected = np.moveaxis(LabelLUT.from_collection(crop, ["Mito", "Cyto"]).apply(volume), 0, 1)
+        np.testing.assert_array_equal(masks[:, [0, 2]], expected)
+        assert not masks[:, [1, 3]].any()
+        assert valid[:, [0, 2]].all()
+        assert not valid[:, [1, 3]].any()
+
+    def test_dtype(self, crop):
+        transform = TargetTransform([crop.get_label_by_name("Mito")], crop, dtype=np.float32)
+        masks, _ = transform(np.array([[1, 4, -1, 9]]))
+        assert masks.dtype == np.float32
+        np.testing.assert_array_equal(masks, [[[1.0, 0.0, 0.0, 0.0]]])
+
+    def test_invalid(self, crop):
+        transform = TargetTransform([crop.get_label_by_name("Mito")], crop)
+        with pytest.raises(TypeError):
+            transform(np.zeros((1, 2)))
+        with pytest.raises(ValueError):
+            transform(np.array(1))